@@ -0,0 +1,143 @@
+"""Latency benchmarks for the Student Data API query paths.
+
+Usage:
+    python benchmarks.py students [--repeat 5] [--limit 10]
+    python benchmarks.py score [--sizes 1,10,100,1000,10000,100000] [--url http://localhost:8000]
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from db_pool import ConnectionPool
+from queries import (
+    SUBJECTS_FOR_STUDENTS_QUERY,
+    build_legacy_students_query,
+    build_students_page_query,
+)
+from scoring import score_batch
+from streaming import encode_scores_json, read_payload
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def bench_students(args):
+    pool = ConnectionPool.from_env()
+    pool.open()
+    cases = [
+        ("page 1", {"page": 1}),
+        ("page 1,000", {"page": 1000}),
+        ("page 40,000", {"page": 40000}),
+        ("page 1, min_gpa=3.5", {"page": 1, "min_gpa": 3.5}),
+    ]
+
+    try:
+        with pool.connection() as conn, conn.cursor() as cursor:
+            def legacy(case):
+                query, params = build_legacy_students_query(limit=args.limit, **case)
+                cursor.execute(query, params)
+                cursor.fetchall()
+
+            def paged(case):
+                query, params = build_students_page_query(limit=args.limit, **case)
+                cursor.execute(query, params)
+                ids = [row[0] for row in cursor.fetchall()]
+                if ids:
+                    cursor.execute(SUBJECTS_FOR_STUDENTS_QUERY, [ids])
+                    cursor.fetchall()
+
+            def keyset(case):
+                query, params = build_students_page_query(
+                    limit=args.limit, after_id=(case["page"] - 1) * args.limit,
+                    min_gpa=case.get("min_gpa"),
+                )
+                cursor.execute(query, params)
+                ids = [row[0] for row in cursor.fetchall()]
+                if ids:
+                    cursor.execute(SUBJECTS_FOR_STUDENTS_QUERY, [ids])
+                    cursor.fetchall()
+
+            print(f"\n/students query plans (limit={args.limit}, median of {args.repeat} runs)")
+            print(f"{'case':<24}{'legacy ms':>12}{'page-first ms':>16}{'keyset ms':>12}{'speedup':>10}")
+            for label, case in cases:
+                legacy_ms = time_call(lambda: legacy(case), args.repeat)
+                paged_ms = time_call(lambda: paged(case), args.repeat)
+                keyset_ms = time_call(lambda: keyset(case), args.repeat)
+                print(f"{label:<24}{legacy_ms:>12.1f}{paged_ms:>16.1f}{keyset_ms:>12.1f}"
+                      f"{legacy_ms / paged_ms:>9.1f}x")
+    finally:
+        pool.close()
+
+
+def score_payload(size, seed=42):
+    rng = np.random.default_rng(seed)
+    gpa = rng.uniform(2.0, 4.0, size).round(2)
+    attendance_rate = rng.uniform(0.7, 1.0, size).round(2)
+    gpa[rng.random(size) < 0.05] = np.nan
+    return json.dumps({
+        "gpa": [None if np.isnan(value) else value for value in gpa.tolist()],
+        "attendance_rate": attendance_rate.tolist(),
+    }).encode()
+
+
+def bench_score(args):
+    sizes = [int(size) for size in args.sizes.split(",")]
+    client = None
+    if args.url:
+        import httpx
+        client = httpx.Client(base_url=args.url, timeout=60)
+
+    print(f"\nPOST /students/score throughput (median of {args.repeat} runs)")
+    header = f"{'batch':>8}{'score rec/s':>16}{'parse+score+encode rec/s':>28}"
+    if client:
+        header += f"{'HTTP rec/s':>14}{'HTTP ms':>10}"
+    print(header)
+    try:
+        for size in sizes:
+            body = score_payload(size)
+            columns = read_payload(body, "application/json")
+            score_ms = time_call(lambda: score_batch(columns), args.repeat)
+            full_ms = time_call(
+                lambda: encode_scores_json(score_batch(read_payload(body, "application/json"))),
+                args.repeat,
+            )
+            line = f"{size:>8}{size / score_ms * 1000:>16,.0f}{size / full_ms * 1000:>28,.0f}"
+            if client:
+                def post():
+                    response = client.post("/students/score", content=body,
+                                           headers={"Content-Type": "application/json"})
+                    response.raise_for_status()
+                http_ms = time_call(post, args.repeat)
+                line += f"{size / http_ms * 1000:>14,.0f}{http_ms:>10.1f}"
+            print(line)
+    finally:
+        if client:
+            client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Student Data API benchmarks")
+    subcommands = parser.add_subparsers(dest="benchmark", required=True)
+
+    students = subcommands.add_parser("students", help="legacy vs page-first /students queries")
+    students.add_argument("--repeat", type=int, default=5)
+    students.add_argument("--limit", type=int, default=10)
+    students.set_defaults(func=bench_students)
+
+    score = subcommands.add_parser("score", help="batch scoring throughput by batch size")
+    score.add_argument("--sizes", default="1,10,100,1000,10000,100000")
+    score.add_argument("--repeat", type=int, default=5)
+    score.add_argument("--url", default=None, help="also POST each batch to a running API")
+    score.set_defaults(func=bench_score)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,214 @@
+import asyncio
+import itertools
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from decouple import config
+
+from db_pool import ConnectionPool, PoolTimeout
+
+try:
+    import asyncpg
+except ImportError:  # asyncpg is optional; fall back to psycopg2 on the executor
+    asyncpg = None
+
+
+_PLACEHOLDER = re.compile(r"%s|%%")
+_cursor_ids = itertools.count(1)
+
+
+def to_asyncpg_query(query):
+    """Rewrite psycopg2 ``%s`` placeholders as asyncpg ``$1, $2, ...``."""
+    counter = 0
+
+    def replace(match):
+        nonlocal counter
+        if match.group(0) == "%%":
+            return "%"
+        counter += 1
+        return f"${counter}"
+
+    return _PLACEHOLDER.sub(replace, query)
+
+
+class Database:
+    """Async data-access layer used by the API endpoints.
+
+    Queries are written once in psycopg2 paramstyle. With the ``asyncpg``
+    driver they run natively on asyncpg's own pool; with ``psycopg2`` they run
+    on a ConnectionPool inside a bounded thread pool, so blocking calls never
+    stall the event loop. Either way at most ``max_workers`` queries are in
+    flight and the rest wait on the loop rather than in an unbounded queue.
+    """
+
+    def __init__(self, driver="asyncpg", min_size=1, max_size=10, max_wait=5.0,
+                 max_workers=None, health_check_interval=30.0, **connect_kwargs):
+        if driver == "asyncpg" and asyncpg is None:
+            driver = "psycopg2"
+        if driver not in ("asyncpg", "psycopg2"):
+            raise ValueError(f"Unsupported database driver: {driver}")
+        self.driver = driver
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.max_workers = max_workers or max_size
+        self.connect_kwargs = connect_kwargs
+
+        self._async_pool = None
+        self._sync_pool = ConnectionPool(
+            minconn=min_size,
+            maxconn=max_size,
+            max_wait=max_wait,
+            health_check_interval=health_check_interval,
+            **connect_kwargs,
+        )
+        self._executor = None
+        self._slots = None
+
+    @classmethod
+    def from_env(cls):
+        max_size = config('DB_POOL_MAX', default=10, cast=int)
+        return cls(
+            driver=config('DB_DRIVER', default='asyncpg'),
+            min_size=config('DB_POOL_MIN', default=1, cast=int),
+            max_size=max_size,
+            max_wait=config('DB_POOL_MAX_WAIT', default=5.0, cast=float),
+            max_workers=config('DB_EXECUTOR_WORKERS', default=max_size, cast=int),
+            health_check_interval=config('DB_POOL_HEALTH_CHECK_INTERVAL', default=30.0, cast=float),
+            dbname=config('DB_NAME'),
+            user=config('DB_USER'),
+            password=config('DB_PASSWORD'),
+            host=config('DB_HOST', default='localhost'),
+            port=config('DB_PORT', default='5432'),
+        )
+
+    async def open(self):
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="db"
+        )
+        if self.driver == "asyncpg":
+            kwargs = dict(self.connect_kwargs)
+            kwargs["database"] = kwargs.pop("dbname", None)
+            kwargs["port"] = int(kwargs.get("port") or 5432)
+            self._async_pool = await asyncpg.create_pool(
+                min_size=self.min_size, max_size=self.max_size, **kwargs
+            )
+        else:
+            await self.run_blocking(self._sync_pool.open)
+
+    async def close(self):
+        if self._async_pool is not None:
+            await self._async_pool.close()
+            self._async_pool = None
+        if self._sync_pool.is_open:
+            await self.run_blocking(self._sync_pool.close)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking callable on the bounded executor."""
+        if self._executor is None:
+            raise RuntimeError("Database is not open")
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _acquire_async(self):
+        try:
+            return await asyncio.wait_for(self._async_pool.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            raise PoolTimeout(
+                f"No database connection available after {self.max_wait:.1f}s "
+                f"({self.max_size} in use)"
+            )
+
+    def _fetch_sync(self, query, params, one):
+        with self._sync_pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchone() if one else cursor.fetchall()
+
+    async def fetch(self, query, params=()):
+        if self.driver == "asyncpg":
+            async with self._slots:
+                conn = await self._acquire_async()
+                try:
+                    return await conn.fetch(to_asyncpg_query(query), *params)
+                finally:
+                    await self._async_pool.release(conn)
+        return await self.run_blocking(self._fetch_sync, query, list(params), False)
+
+    async def fetchrow(self, query, params=()):
+        if self.driver == "asyncpg":
+            async with self._slots:
+                conn = await self._acquire_async()
+                try:
+                    return await conn.fetchrow(to_asyncpg_query(query), *params)
+                finally:
+                    await self._async_pool.release(conn)
+        return await self.run_blocking(self._fetch_sync, query, list(params), True)
+
+    async def stream(self, query, params=(), chunk_size=1000):
+        """Yield the result of ``query`` in lists of up to ``chunk_size`` rows.
+
+        Rows come from a server-side cursor, so only one chunk is ever held in
+        memory. The connection stays checked out until the generator finishes
+        or is closed (e.g. when the client disconnects mid-stream).
+        """
+        if self.driver == "asyncpg":
+            conn = await self._acquire_async()
+            try:
+                # asyncpg cursors only exist inside a transaction
+                async with conn.transaction():
+                    cursor = await conn.cursor(to_asyncpg_query(query), *params)
+                    while True:
+                        async with self._slots:
+                            rows = await cursor.fetch(chunk_size)
+                        if not rows:
+                            break
+                        yield rows
+            finally:
+                await self._async_pool.release(conn)
+            return
+
+        conn = await self.run_blocking(self._sync_pool.acquire)
+        # A named cursor is a server-side cursor in psycopg2
+        cursor = conn.cursor(name=f"stream_{next(_cursor_ids)}")
+        try:
+            cursor.itersize = chunk_size
+            await self.run_blocking(cursor.execute, query, list(params))
+            while True:
+                rows = await self.run_blocking(cursor.fetchmany, chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            await self.run_blocking(cursor.close)
+            await self.run_blocking(self._sync_pool.release, conn)
+
+    async def check(self):
+        """Round-trip ``SELECT 1``; returns latency in ms."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await self.fetchrow("SELECT 1")
+        return (loop.time() - started) * 1000
+
+    def stats(self):
+        stats = {"driver": self.driver, "executor_workers": self.max_workers}
+        if self._async_pool is not None:
+            size = self._async_pool.get_size()
+            idle = self._async_pool.get_idle_size()
+            stats["pool"] = {
+                "open": True,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": size,
+                "in_use": size - idle,
+                "available": self.max_size - (size - idle),
+                "saturation": (size - idle) / self.max_size,
+            }
+        else:
+            stats["pool"] = self._sync_pool.stats()
+        return stats
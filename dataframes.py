@@ -4,11 +4,19 @@ from datetime import datetime
 import psycopg2
 from sqlalchemy import create_engine
 from decouple import config
-import matplotlib.pyplot as plt
-import seaborn as sns
-import os
+import argparse
 from urllib.parse import quote_plus
 
+from pipeline_io import ParquetChunkWriter, run_stage, write_parquet
+from plotting import box_plot, histogram, render_figures
+from ragged import RaggedColumn
+from schema import apply_schema
+from scoring import performance_score
+
+OUTPUT_PATH = 'processed_student_data.parquet'
+
+GRADE_POINTS = {'A': 4.0, 'B': 3.0, 'C': 2.0, 'D': 1.0, 'F': 0.0}
+
 def get_database_connection():
     try:
         DB_NAME = config('DB_NAME')
@@ -27,25 +35,85 @@ def get_database_connection():
         print(f"Error connecting to database: {e}")
         return None
 
-def load_data(engine):
-    print("\n1. LOADING 500,000 ROWS OF DATA...")
-    
-    query = """
-    SELECT 
-        s.*,
-        array_agg(DISTINCT sub.subject_name) as subjects,
-        array_agg(DISTINCT ss.grade) as grades
-    FROM students s
-    LEFT JOIN student_subjects ss ON s.student_id = ss.student_id
-    LEFT JOIN subjects sub ON ss.subject_id = sub.subject_id
-    GROUP BY s.student_id, s.name, s.age, s.grade_level, 
-             s.enrollment_date, s.gpa, s.attendance_rate
+# Explicit columns: students also carries the stored performance_score and
+# academic_status (migration 5), which create_features computes itself
+STUDENTS_QUERY = """
+SELECT 
+    s.student_id, s.name, s.age, s.grade_level,
+    s.enrollment_date, s.gpa, s.attendance_rate,
+    array_agg(DISTINCT sub.subject_name) as subjects,
+    array_agg(DISTINCT ss.grade) as grades
+FROM students s
+LEFT JOIN student_subjects ss ON s.student_id = ss.student_id
+LEFT JOIN subjects sub ON ss.subject_id = sub.subject_id
+GROUP BY s.student_id, s.name, s.age, s.grade_level, 
+         s.enrollment_date, s.gpa, s.attendance_rate
+ORDER BY s.student_id
+"""
+
+# Dataset-wide values the per-chunk steps need: the null fill values and the
+# qcut edges (percentile_cont matches pd.qcut's linear interpolation)
+GLOBAL_STATS_QUERY = """
+WITH fill AS (
+    SELECT
+        avg(gpa) as gpa_mean,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY attendance_rate) as attendance_median
+    FROM students
+)
+SELECT
+    fill.gpa_mean,
+    fill.attendance_median,
+    percentile_cont(ARRAY[0, 0.25, 0.5, 0.75, 1])
+        WITHIN GROUP (ORDER BY coalesce(s.gpa, fill.gpa_mean)) as gpa_edges,
+    percentile_cont(ARRAY[0, 1/3.0, 2/3.0, 1])
+        WITHIN GROUP (ORDER BY coalesce(s.attendance_rate, fill.attendance_median)) as attendance_edges
+FROM students s
+CROSS JOIN fill
+GROUP BY fill.gpa_mean, fill.attendance_median
+"""
+
+def _stream_chunks(engine, chunksize):
+    # The connection holds the server-side cursor; closed once the chunks
+    # are exhausted or the generator is closed early
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True)
+        for chunk in pd.read_sql_query(STUDENTS_QUERY, conn, chunksize=chunksize):
+            yield apply_schema(chunk)
+
+def load_data(engine, chunksize=None):
+    """Load the student dataset.
+
+    With ``chunksize`` the rows are streamed through a server-side cursor and
+    an iterator of DataFrames is returned instead of one large DataFrame.
     """
-    
-    df = pd.read_sql_query(query, engine)
+    if chunksize:
+        print(f"\n1. STREAMING DATA IN CHUNKS OF {chunksize:,} ROWS...")
+        return _stream_chunks(engine, chunksize)
+
+    print("\n1. LOADING 500,000 ROWS OF DATA...")
+    df = pd.read_sql_query(STUDENTS_QUERY, engine)
     print(f"Loaded {len(df):,} records successfully!")
+
+    # Compact dtypes (int8/int16/categorical/Arrow strings and lists)
+    memory_before = df.memory_usage(deep=True, index=False).sum()
+    df = apply_schema(df)
+    memory_after = df.memory_usage(deep=True, index=False).sum()
+    print(f"Memory: {memory_before / 2**20:,.1f} MB -> {memory_after / 2**20:,.1f} MB")
     return df
 
+def load_global_stats(engine):
+    stats = pd.read_sql_query(GLOBAL_STATS_QUERY, engine).iloc[0]
+    return {
+        'fill_values': {
+            'gpa': float(stats['gpa_mean']),
+            'attendance_rate': float(stats['attendance_median']),
+        },
+        'bins': {
+            'gpa': [float(edge) for edge in stats['gpa_edges']],
+            'attendance_rate': [float(edge) for edge in stats['attendance_edges']],
+        },
+    }
+
 def describe_dataset(df):
     print("\n2. DESCRIBING DATASET...")
     
@@ -61,73 +129,88 @@ def describe_dataset(df):
     print("\nNull Values Count:")
     print(df.isnull().sum())
     
-    # Create visualizations directory
-    if not os.path.exists('visualizations'):
-        os.makedirs('visualizations')
-    
-    # GPA Distribution
-    plt.figure(figsize=(10, 6))
-    sns.histplot(data=df, x='gpa', bins=50)
-    plt.title('GPA Distribution')
-    plt.savefig('visualizations/gpa_distribution.png')
-    plt.close()
-    
-    # Age vs GPA
-    plt.figure(figsize=(10, 6))
-    sns.boxplot(data=df, x='grade_level', y='gpa')
-    plt.title('GPA by Grade Level')
-    plt.savefig('visualizations/gpa_by_grade.png')
-    plt.close()
-    
     return df
 
-def handle_null_values(df):
-    print("\n3. HANDLING NULL VALUES...")
-    
-    print("Null values before:")
-    print(df.isnull().sum())
-    
-    # Handle numerical nulls
-    df['gpa'] = df['gpa'].fillna(df['gpa'].mean())
-    df['attendance_rate'] = df['attendance_rate'].fillna(df['attendance_rate'].median())
-    
-    print("\nNull values after:")
-    print(df.isnull().sum())
+def dataset_figures(df):
+    # Aggregated here, drawn later by plotting.render_figures
+    return [
+        histogram('gpa_distribution', df['gpa'], 'GPA Distribution', 'gpa'),
+        box_plot('gpa_by_grade', df['gpa'], df['grade_level'],
+                 'GPA by Grade Level', 'grade_level', 'gpa'),
+    ]
+
+def feature_figures(df):
+    return [
+        box_plot('performance_by_status', df['performance_score'], df['academic_status'],
+                 'Performance Score by Academic Status', 'academic_status',
+                 'performance_score', figsize=(12, 6)),
+    ]
+
+def handle_null_values(df, fill_values=None, verbose=True):
+    if verbose:
+        print("\n3. HANDLING NULL VALUES...")
+        
+        print("Null values before:")
+        print(df.isnull().sum())
+    
+    # Handle numerical nulls (dataset-wide values when processing chunks)
+    if fill_values is None:
+        fill_values = {
+            'gpa': df['gpa'].mean(),
+            'attendance_rate': df['attendance_rate'].median(),
+        }
+    df['gpa'] = df['gpa'].fillna(fill_values['gpa'])
+    df['attendance_rate'] = df['attendance_rate'].fillna(fill_values['attendance_rate'])
+    
+    if verbose:
+        print("\nNull values after:")
+        print(df.isnull().sum())
     
     return df
 
-def preprocess_data(df):
-    print("\n4. PREPROCESSING DATA...")
+def preprocess_data(df, now=None, verbose=True):
+    if verbose:
+        print("\n4. PREPROCESSING DATA...")
     
     # Convert enrollment_date to datetime if it's not already
     df['enrollment_date'] = pd.to_datetime(df['enrollment_date'])
     
     # Calculate days since enrollment
-    df['days_enrolled'] = (datetime.now() - df['enrollment_date']).dt.days
+    df['days_enrolled'] = ((now or datetime.now()) - df['enrollment_date']).dt.days
+    
+    # Flatten the list columns once; per-student aggregates are then bincounts
+    subjects = RaggedColumn.from_lists(df['subjects'])
+    grades = RaggedColumn.from_lists(df['grades'])
     
     # Calculate number of subjects per student
-    df['num_subjects'] = df['subjects'].apply(len)
+    df['num_subjects'] = subjects.count()
     
     # Convert grades to GPA points
-    grade_points = {'A': 4.0, 'B': 3.0, 'C': 2.0, 'D': 1.0, 'F': 0.0}
-    df['average_grade_points'] = df['grades'].apply(
-        lambda x: sum(grade_points[grade] for grade in x) / len(x)
-    )
+    df['average_grade_points'] = grades.segment_mean(grades.map_values(GRADE_POINTS))
     
     return df
 
-def create_features(df):
-    print("\n5. CREATING NEW FEATURES...")
-    
-    # Academic performance categories
-    df['academic_status'] = pd.qcut(df['gpa'], 
-                                  q=4, 
-                                  labels=['Poor', 'Fair', 'Good', 'Excellent'])
+def create_features(df, bins=None, verbose=True):
+    if verbose:
+        print("\n5. CREATING NEW FEATURES...")
+    
+    # Academic performance categories (quantile edges are passed in for chunks)
+    if bins is None:
+        df['academic_status'] = pd.qcut(df['gpa'], 
+                                      q=4, 
+                                      labels=['Poor', 'Fair', 'Good', 'Excellent'])
+    else:
+        df['academic_status'] = pd.cut(df['gpa'], bins=bins['gpa'], include_lowest=True,
+                                       labels=['Poor', 'Fair', 'Good', 'Excellent'])
     
     # Attendance categories
-    df['attendance_category'] = pd.qcut(df['attendance_rate'], 
-                                      q=3, 
-                                      labels=['Low', 'Medium', 'High'])
+    if bins is None:
+        df['attendance_category'] = pd.qcut(df['attendance_rate'], 
+                                          q=3, 
+                                          labels=['Low', 'Medium', 'High'])
+    else:
+        df['attendance_category'] = pd.cut(df['attendance_rate'], bins=bins['attendance_rate'],
+                                           include_lowest=True, labels=['Low', 'Medium', 'High'])
     
     # Age groups
     df['age_group'] = pd.cut(df['age'], 
@@ -135,18 +218,10 @@ def create_features(df):
                             labels=['Junior', 'Intermediate', 'Senior'])
     
     # Performance score (combining GPA, attendance, and grades)
-    df['performance_score'] = (
-        df['gpa'] * 0.4 + 
-        df['attendance_rate'] * 0.3 + 
-        df['average_grade_points'] * 0.3
-    )
-    
-    # Create visualization of new features
-    plt.figure(figsize=(12, 6))
-    sns.boxplot(data=df, x='academic_status', y='performance_score')
-    plt.title('Performance Score by Academic Status')
-    plt.savefig('visualizations/performance_by_status.png')
-    plt.close()
+    df['performance_score'] = performance_score(df, 'pipeline-v1')
+    
+    if not verbose:
+        return df
     
     print("\nNew features created:")
     print("- academic_status (Poor/Fair/Good/Excellent)")
@@ -159,31 +234,71 @@ def create_features(df):
     
     return df
 
+def process_in_chunks(engine, chunksize, output_path=OUTPUT_PATH):
+    """Run the pipeline chunk by chunk in a fixed memory budget.
+
+    Null fill values and quantile edges come from one SQL pass over the
+    whole table, so every chunk is transformed exactly as the in-memory
+    pipeline would transform it. Plots need the full dataset and are
+    skipped in this mode.
+    """
+    global_stats = load_global_stats(engine)
+    now = datetime.now()
+    total_rows = 0
+
+    with ParquetChunkWriter(output_path) as writer:
+        for chunk in load_data(engine, chunksize=chunksize):
+            chunk = handle_null_values(chunk, global_stats['fill_values'], verbose=False)
+            chunk = preprocess_data(chunk, now=now, verbose=False)
+            chunk = create_features(chunk, bins=global_stats['bins'], verbose=False)
+            writer.write(chunk)
+            total_rows += len(chunk)
+            print(f"Processed {total_rows:,} rows...")
+
+    print(f"Data saved to '{output_path}'")
+    print(f"\nFinal dataset rows: {total_rows:,}")
+
 def main():
+    parser = argparse.ArgumentParser(description="Student data processing pipeline")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="stream the table in chunks of this many rows")
+    args = parser.parse_args()
+
     # Connect to database
     engine = get_database_connection()
     if engine is None:
         return
     
+    if args.chunksize:
+        process_in_chunks(engine, args.chunksize)
+        return
+    
     # Load data
     df = load_data(engine)
     
     # Describe dataset
     df = describe_dataset(df)
+    figures = dataset_figures(df)
     
+    # Each stage is skipped when its snapshotted inputs haven't changed
     # Handle null values
-    df = handle_null_values(df)
+    df = run_stage('handle_null_values', handle_null_values, df)
     
-    # Preprocess data
-    df = preprocess_data(df)
+    # Preprocess data (days_enrolled counts whole days, so key it on today)
+    today = pd.Timestamp.now().normalize()
+    df = run_stage('preprocess_data', preprocess_data, df, now=today)
     
     # Create features
-    df = create_features(df)
+    df = run_stage('create_features', create_features, df)
+    
+    # Render all figures together on a process pool; unchanged ones are skipped
+    print("\nRendering visualizations...")
+    render_figures(figures + feature_figures(df), 'visualizations')
     
     # Save processed dataset
     print("\nSaving processed dataset...")
-    df.to_csv('processed_student_data.csv', index=False)
-    print("Data saved to 'processed_student_data.csv'")
+    write_parquet(df, OUTPUT_PATH)
+    print(f"Data saved to '{OUTPUT_PATH}'")
     
     print("\nFinal dataset shape:", df.shape)
     print("\nVisualization plots saved in 'visualizations' directory")
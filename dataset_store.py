@@ -0,0 +1,137 @@
+"""Holder for the in-API student dataset of myendpoints.py.
+
+The dataset is loaded on a background thread so the app starts serving
+immediately. The first load builds it and writes an Arrow IPC snapshot.
+Later starts memory-map that snapshot instead of rebuilding. The snapshot
+file name carries a hash of the builder's code (the same key run_stage
+uses, which covers schema.py), so a changed generator or schema builds a
+fresh snapshot instead of loading stale dtypes. Readers always
+get a complete frame, and publishing a new one is a single reference swap.
+Artifacts computed from the frame (indexes, summaries) are cached per
+version through ``derived`` and rebuilt after the next publish.
+"""
+import glob
+import os
+import threading
+import time
+
+from pipeline_io import load_snapshot, save_snapshot, stage_key
+
+
+class DatasetNotReady(Exception):
+    """Raised when the dataset is requested before it has finished loading."""
+
+
+class DatasetStore:
+    def __init__(self, builder, snapshot_path=None, key_extra=None):
+        self.builder = builder
+        self.snapshot_path = None
+        self._snapshot_pattern = None
+        self._legacy_snapshot = snapshot_path
+        if snapshot_path:
+            root, ext = os.path.splitext(snapshot_path)
+            key = stage_key("dataset", builder, None, (), {}, key_extra)
+            self.snapshot_path = f"{root}-{key}{ext}"
+            self._snapshot_pattern = f"{glob.escape(root)}-*{ext}"
+        self._df = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+        self._source = None
+        self._load_seconds = None
+        self._error = None
+        self._derived = {}
+
+    def _remove_stale_snapshots(self):
+        # Snapshots of earlier builder or schema versions, and the unkeyed one
+        for path in glob.glob(self._snapshot_pattern) + glob.glob(glob.escape(self._legacy_snapshot)):
+            if path != self.snapshot_path:
+                os.remove(path)
+
+    def start_loading(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name="dataset-loader", daemon=True)
+            self._thread.start()
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            if self.snapshot_path and os.path.exists(self.snapshot_path):
+                df = load_snapshot(self.snapshot_path)
+                self._source = "snapshot"
+            else:
+                df = self.builder()
+                self._source = "generated"
+                if self.snapshot_path:
+                    save_snapshot(df, self.snapshot_path)
+                    self._remove_stale_snapshots()
+            self._load_seconds = time.perf_counter() - started
+            self.publish(df)
+        except Exception as e:
+            self._error = str(e)
+
+    def wait(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    @property
+    def version(self):
+        return self._version
+
+    def get(self):
+        if not self._ready.is_set():
+            raise DatasetNotReady(self._error or "Dataset is still loading")
+        return self._df
+
+    def snapshot(self):
+        """The current (frame, version) pair, read together."""
+        if not self._ready.is_set():
+            raise DatasetNotReady(self._error or "Dataset is still loading")
+        with self._lock:
+            return self._df, self._version
+
+    def publish(self, df, expected_version=None):
+        """Atomically replace the current dataset and bump its version.
+
+        With ``expected_version`` the swap only happens if no other publish
+        got in first; otherwise nothing changes and None is returned.
+        """
+        with self._lock:
+            if expected_version is not None and expected_version != self._version:
+                return None
+            self._df = df
+            self._version += 1
+            self._derived = {}
+            self._ready.set()
+        return self._version
+
+    def derived(self, name, build):
+        """Return ``build(df)`` for the current version, computing it once per version."""
+        if not self._ready.is_set():
+            raise DatasetNotReady(self._error or "Dataset is still loading")
+        with self._lock:
+            df, version = self._df, self._version
+            cached = self._derived.get(name)
+        if cached is not None:
+            return cached
+        value = build(df)
+        with self._lock:
+            # Don't cache an artifact of a frame that was replaced meanwhile
+            if self._version == version:
+                self._derived[name] = value
+        return value
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "version": self._version,
+            "rows": len(self._df) if self._df is not None else 0,
+            "source": self._source,
+            "snapshot_path": self.snapshot_path,
+            "load_seconds": self._load_seconds,
+            "error": self._error,
+        }
@@ -0,0 +1,194 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+from decouple import config
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became free within the pool's max wait."""
+
+
+class ConnectionPool:
+    """Bounded psycopg2 connection pool with health checks and saturation metrics.
+
+    Borrowers wait at most ``max_wait`` seconds for a free slot. Connections that
+    have been idle longer than ``health_check_interval`` are pinged with
+    ``SELECT 1`` before being handed out, and broken ones are replaced.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, max_wait=5.0,
+                 health_check_interval=30.0, **connect_kwargs):
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError("Pool size must satisfy 1 <= maxconn and minconn <= maxconn")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_wait = max_wait
+        self.health_check_interval = health_check_interval
+        self.connect_kwargs = connect_kwargs
+
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._last_used = {}
+
+        # Saturation metrics
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._waiting = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._health_check_failures = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            minconn=config('DB_POOL_MIN', default=1, cast=int),
+            maxconn=config('DB_POOL_MAX', default=10, cast=int),
+            max_wait=config('DB_POOL_MAX_WAIT', default=5.0, cast=float),
+            health_check_interval=config('DB_POOL_HEALTH_CHECK_INTERVAL', default=30.0, cast=float),
+            dbname=config('DB_NAME'),
+            user=config('DB_USER'),
+            password=config('DB_PASSWORD'),
+            host=config('DB_HOST', default='localhost'),
+            port=config('DB_PORT', default='5432'),
+        )
+
+    def open(self):
+        if self._pool is None:
+            self._pool = pg_pool.ThreadedConnectionPool(
+                self.minconn, self.maxconn, **self.connect_kwargs
+            )
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+            self._last_used.clear()
+
+    @property
+    def is_open(self):
+        return self._pool is not None
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        # A slot is held for every connection in use, so getconn() never
+        # exceeds maxconn and this loop only retries after a failed health check.
+        while True:
+            conn = self._pool.getconn()
+            if self._is_healthy(conn):
+                return conn
+            with self._lock:
+                self._health_check_failures += 1
+            self._last_used.pop(id(conn), None)
+            self._pool.putconn(conn, close=True)
+
+    def acquire(self):
+        if self._pool is None:
+            raise RuntimeError("Connection pool is not open")
+
+        started = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.max_wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        waited = time.monotonic() - started
+        if not acquired:
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeout(
+                f"No database connection available after {self.max_wait:.1f}s "
+                f"({self.maxconn} in use)"
+            )
+
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._acquired += 1
+            self._total_wait += waited
+            self._max_wait_seen = max(self._max_wait_seen, waited)
+        return conn
+
+    def release(self, conn):
+        try:
+            if self._pool is None:
+                conn.close()
+                return
+            discard = conn.closed
+            if not discard:
+                try:
+                    # Never hand out a connection stuck in a transaction
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+            if discard:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=discard)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def check(self):
+        """Run a round-trip query on a pooled connection; returns latency in ms."""
+        started = time.monotonic()
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        return (time.monotonic() - started) * 1000
+
+    def stats(self):
+        with self._lock:
+            return {
+                "open": self.is_open,
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "in_use": self._in_use,
+                "available": self.maxconn - self._in_use,
+                "waiting": self._waiting,
+                "peak_in_use": self._peak_in_use,
+                "saturation": self._in_use / self.maxconn,
+                "total_acquired": self._acquired,
+                "total_timeouts": self._timeouts,
+                "health_check_failures": self._health_check_failures,
+                "avg_wait_ms": (self._total_wait / self._acquired * 1000) if self._acquired else 0.0,
+                "max_wait_ms": self._max_wait_seen * 1000,
+            }
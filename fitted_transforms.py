@@ -0,0 +1,201 @@
+"""Fitted parameters of the ml_analysis feature stages, saved for reuse.
+
+FittedTransforms holds what handle_null_values, preprocess_data and
+create_features learn from the data: the imputer means, the StandardScaler
+mean and scale per column, the enrollment-date origin, and the qcut edges
+(in scaled units). It round-trips through a small JSON file, so students
+can be scored later without the training data:
+
+- transform_record scores one dict in plain Python (a few microseconds).
+- transform_arrays scores columns of any length with NumPy.
+- transform applies the full stage output to a DataFrame.
+"""
+import bisect
+import json
+import os
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from scoring import ACADEMIC_LABELS, SCORE_FORMULAS
+
+
+SCALED_COLUMNS = ['age', 'gpa', 'attendance_rate', 'days_enrolled']
+IMPUTED_COLUMNS = ['gpa', 'attendance_rate']
+
+ACADEMIC_QUANTILES = [0, 0.25, 0.5, 0.75, 1]
+ATTENDANCE_QUANTILES = [0, 1 / 3, 2 / 3, 1]
+
+ML_SCORE = SCORE_FORMULAS['ml-v1']
+ATTENDANCE_LABELS = ['Low', 'Medium', 'High']
+AGE_BINS = [14, 16, 18, 22]
+AGE_LABELS = ['Junior', 'Intermediate', 'Senior']
+
+
+def _label_codes(values, edges, include_lowest, clip=False):
+    """pd.cut codes (right-closed bins) for an array; -1 where out of range or NaN.
+
+    With ``clip`` values outside the edges go to the first or last bin and
+    only NaN gets -1, as new data should for bins fitted on a sample.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    edges = np.asarray(edges, dtype=np.float64)
+    if clip:
+        codes = np.searchsorted(edges[1:-1], values, side='left')
+        return np.where(np.isnan(values), -1, codes)
+    codes = np.searchsorted(edges, values, side='left') - 1
+    inside = (values > edges[0]) & (values <= edges[-1])
+    if include_lowest:
+        codes = np.where(values == edges[0], 0, codes)
+        inside |= values == edges[0]
+    return np.where(inside, codes, -1)
+
+
+def _label(value, edges, labels, include_lowest, clip=False):
+    """pd.cut for one value; ``clip`` as in _label_codes."""
+    if value is None or value != value:
+        return None
+    if clip:
+        return labels[bisect.bisect_left(edges[1:-1], value)]
+    if include_lowest and value == edges[0]:
+        return labels[0]
+    if value <= edges[0] or value > edges[-1]:
+        return None
+    return labels[bisect.bisect_left(edges, value) - 1]
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+class FittedTransforms:
+    def __init__(self, fill, mean, scale, date_origin, bins):
+        self.fill = {column: float(value) for column, value in fill.items()}
+        self.mean = {column: float(value) for column, value in mean.items()}
+        self.scale = {column: float(value) for column, value in scale.items()}
+        self.date_origin = _to_date(date_origin)
+        self.bins = {column: [float(edge) for edge in edges] for column, edges in bins.items()}
+
+    @classmethod
+    def fit(cls, df):
+        """Fit on a raw frame exactly as the single-process stages would."""
+        fill, mean, scale, scaled = {}, {}, {}, {}
+        dates = pd.to_datetime(df['enrollment_date'])
+        origin = dates.min()
+        columns = {
+            'age': df['age'].to_numpy(dtype=np.float64),
+            'days_enrolled': (dates - origin).dt.days.to_numpy(dtype=np.float64),
+        }
+        for column in IMPUTED_COLUMNS:
+            values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            fill[column] = np.nanmean(values)
+            columns[column] = np.where(np.isnan(values), fill[column], values)
+        for column in SCALED_COLUMNS:
+            mean[column] = columns[column].mean()
+            # Population std, as StandardScaler; constant columns keep scale 1
+            scale[column] = columns[column].std() or 1.0
+            scaled[column] = (columns[column] - mean[column]) / scale[column]
+        bins = {
+            'gpa': np.quantile(scaled['gpa'], ACADEMIC_QUANTILES),
+            'attendance_rate': np.quantile(scaled['attendance_rate'], ATTENDANCE_QUANTILES),
+        }
+        return cls(fill, mean, scale, origin, bins)
+
+    @classmethod
+    def from_params(cls, params):
+        """Build from the dict returned by ml_partitioned.fit_params."""
+        return cls(params['fill'], params['mean'], params['scale'], params['min_date'], params['bins'])
+
+    def to_dict(self):
+        return {
+            'fill': self.fill,
+            'mean': self.mean,
+            'scale': self.scale,
+            'date_origin': self.date_origin.isoformat(),
+            'bins': self.bins,
+        }
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['fill'], data['mean'], data['scale'], data['date_origin'], data['bins'])
+
+    def _scaled(self, column, value):
+        return (value - self.mean[column]) / self.scale[column]
+
+    def transform_record(self, record):
+        """Score one student dict (gpa, attendance_rate, optional age and enrollment_date)."""
+        gpa = record.get('gpa')
+        attendance_rate = record.get('attendance_rate')
+        gpa = self._scaled('gpa', self.fill['gpa'] if gpa is None else float(gpa))
+        attendance_rate = self._scaled(
+            'attendance_rate',
+            self.fill['attendance_rate'] if attendance_rate is None else float(attendance_rate),
+        )
+        result = {
+            'gpa': gpa,
+            'attendance_rate': attendance_rate,
+            'academic_status': _label(gpa, self.bins['gpa'], ACADEMIC_LABELS, True, clip=True),
+            'attendance_category': _label(attendance_rate, self.bins['attendance_rate'], ATTENDANCE_LABELS, True,
+                                          clip=True),
+            'performance_score': ML_SCORE({'gpa': gpa, 'attendance_rate': attendance_rate}),
+        }
+        if record.get('age') is not None:
+            result['age'] = self._scaled('age', float(record['age']))
+            result['age_group'] = _label(result['age'], AGE_BINS, AGE_LABELS, False)
+        if record.get('enrollment_date') is not None:
+            days = (_to_date(record['enrollment_date']) - self.date_origin).days
+            result['days_enrolled'] = self._scaled('days_enrolled', float(days))
+        return result
+
+    def transform_arrays(self, columns):
+        """Vectorized transform_record over a mapping of equal-length arrays.
+
+        Label columns come back as integer codes into ACADEMIC_LABELS,
+        ATTENDANCE_LABELS and AGE_LABELS, with -1 for no label. Values past
+        the fitted quantile edges take the first or last quantile bin.
+        """
+        result = {}
+        for column in IMPUTED_COLUMNS:
+            values = np.asarray(columns[column], dtype=np.float64)
+            result[column] = self._scaled(column, np.where(np.isnan(values), self.fill[column], values))
+        result['academic_status'] = _label_codes(result['gpa'], self.bins['gpa'], True, clip=True)
+        result['attendance_category'] = _label_codes(result['attendance_rate'], self.bins['attendance_rate'], True,
+                                                    clip=True)
+        result['performance_score'] = ML_SCORE(result)
+        if columns.get('age') is not None:
+            result['age'] = self._scaled('age', np.asarray(columns['age'], dtype=np.float64))
+            result['age_group'] = _label_codes(result['age'], AGE_BINS, False)
+        if columns.get('enrollment_date') is not None:
+            dates = pd.to_datetime(pd.Series(columns['enrollment_date']))
+            days = (dates - pd.Timestamp(self.date_origin)).dt.days.to_numpy(dtype=np.float64)
+            result['days_enrolled'] = self._scaled('days_enrolled', days)
+        return result
+
+    def transform(self, df):
+        """The columns the ml_analysis stages produce, added to a copy of ``df``."""
+        arrays = self.transform_arrays({column: df[column] for column in
+                                        ['gpa', 'attendance_rate', 'age', 'enrollment_date']})
+        df = df.copy()
+        for column in SCALED_COLUMNS:
+            df[column] = arrays[column]
+        for column, labels in (('academic_status', ACADEMIC_LABELS),
+                               ('attendance_category', ATTENDANCE_LABELS),
+                               ('age_group', AGE_LABELS)):
+            # Ordered, like the categoricals pd.cut and pd.qcut return
+            df[column] = pd.Categorical.from_codes(arrays[column], categories=labels, ordered=True)
+        df['performance_score'] = arrays['performance_score']
+        return df
@@ -1,14 +1,17 @@
 from faker import Faker
 import psycopg2
+from psycopg2.extras import execute_values
 from decouple import config
-import random
-from datetime import datetime, timedelta
+import argparse
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
 import numpy as np
+import pandas as pd
 from tqdm import tqdm
 
-# Initialize Faker
-fake = Faker()
-
 def get_database_connection():
     try:
         # Get database credentials from .env
@@ -32,35 +35,99 @@ def get_database_connection():
         print(f"Error connecting to database: {e}")
         return None
 
-def generate_student_data(num_records=500000):
-    print("\nGenerating student data...")
-    
-    # Prepare the SQL statement
-    insert_student = """
-    INSERT INTO students (name, age, grade_level, enrollment_date, gpa, attendance_rate)
-    VALUES (%s, %s, %s, %s, %s, %s)
+STUDENT_COLUMNS = ['name', 'age', 'grade_level', 'enrollment_date', 'gpa', 'attendance_rate']
+STUDENT_SUBJECT_COLUMNS = ['student_id', 'subject_id', 'grade']
+
+# Names are drawn from pools sampled once from Faker instead of per student
+FIRST_NAME_POOL_SIZE = 2000
+LAST_NAME_POOL_SIZE = 2000
+FULL_NAME_POOL_SIZE = 200000
+
+GRADES = np.array(['A', 'B', 'C', 'D', 'F'])
+GRADE_WEIGHTS = [0.2, 0.3, 0.3, 0.15, 0.05]
+
+def copy_rows(cursor, table, frame, chunk_size=50000, method='copy', progress=True):
+    """Bulk-load a DataFrame into table in chunks and report throughput.
+
+    method='copy' streams each chunk as CSV through COPY FROM STDIN;
+    method='values' sends batched multi-row INSERT ... VALUES statements.
     """
-    
-    students_data = []
-    for _ in tqdm(range(num_records)):
-        # Generate random student data
-        name = fake.name()
-        age = random.randint(15, 22)
-        grade_level = random.randint(9, 12)
-        
-        # Generate enrollment date within last 4 years
-        enrollment_date = fake.date_between(
-            start_date=datetime.now() - timedelta(days=4*365),
-            end_date=datetime.now()
-        )
-        
-        # Generate GPA and attendance rate with some null values
-        gpa = None if random.random() < 0.05 else round(random.uniform(2.0, 4.0), 2)
-        attendance_rate = None if random.random() < 0.05 else round(random.uniform(0.7, 1.0), 2)
-        
-        students_data.append((name, age, grade_level, enrollment_date, gpa, attendance_rate))
-    
-    return insert_student, students_data
+    column_list = ', '.join(frame.columns)
+    started = time.perf_counter()
+    total = 0
+
+    num_chunks = -(-len(frame) // chunk_size)
+    starts = range(0, len(frame), chunk_size)
+    for start in tqdm(starts, total=num_chunks, desc=table, disable=not progress):
+        chunk = frame.iloc[start:start + chunk_size]
+        if method == 'copy':
+            # NaN is written as an unquoted empty field, which COPY reads as NULL
+            buffer = io.StringIO()
+            chunk.to_csv(buffer, header=False, index=False, na_rep='')
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+        elif method == 'values':
+            rows = chunk.astype(object).where(chunk.notna(), None)
+            execute_values(
+                cursor, f"INSERT INTO {table} ({column_list}) VALUES %s",
+                rows.itertuples(index=False, name=None), page_size=chunk_size
+            )
+        else:
+            raise ValueError(f"Unknown load method: {method}")
+        total += len(chunk)
+
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else float('inf')
+    if progress:
+        print(f"Loaded {total:,} rows into {table} in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    return total
+
+# Independent random streams, so one seed doesn't make columns share draws
+NAME_STREAM, STUDENT_STREAM, SUBJECT_STREAM = 0, 1, 2
+
+def make_rng(seed, *key):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=key))
+
+def build_name_pool(seed=None):
+    fake = Faker()
+    fake.seed_instance(seed)
+    rng = make_rng(seed, NAME_STREAM)
+    first_names = np.array([fake.first_name() for _ in range(FIRST_NAME_POOL_SIZE)])
+    last_names = np.array([fake.last_name() for _ in range(LAST_NAME_POOL_SIZE)])
+    first = first_names[rng.integers(0, FIRST_NAME_POOL_SIZE, FULL_NAME_POOL_SIZE)]
+    last = last_names[rng.integers(0, LAST_NAME_POOL_SIZE, FULL_NAME_POOL_SIZE)]
+    return np.char.add(np.char.add(first, ' '), last).astype(object)
+
+def generate_student_data(num_records=500000, seed=None, name_pool=None, today=None, chunk=0):
+    """Generate num_records students as whole NumPy columns.
+
+    The same seed and chunk always produce the same rows (for a fixed ``today``).
+    """
+    rng = make_rng(seed, STUDENT_STREAM, chunk)
+    if name_pool is None:
+        name_pool = build_name_pool(seed)
+    if today is None:
+        today = date.today()
+
+    # Enrollment dates within the last 4 years, as day offsets from today
+    offsets = rng.integers(0, 4 * 365 + 1, num_records).astype('timedelta64[D]')
+
+    # GPA and attendance rate with ~5% nulls each
+    gpa = np.round(rng.uniform(2.0, 4.0, num_records), 2)
+    gpa[rng.random(num_records) < 0.05] = np.nan
+    attendance_rate = np.round(rng.uniform(0.7, 1.0, num_records), 2)
+    attendance_rate[rng.random(num_records) < 0.05] = np.nan
+
+    return pd.DataFrame({
+        'name': name_pool[rng.integers(0, len(name_pool), num_records)],
+        'age': rng.integers(15, 23, num_records, dtype=np.int16),
+        'grade_level': rng.integers(9, 13, num_records, dtype=np.int16),
+        'enrollment_date': np.datetime64(today, 'D') - offsets,
+        'gpa': gpa,
+        'attendance_rate': attendance_rate,
+    }, columns=STUDENT_COLUMNS)
 
 def generate_subjects():
     subjects = [
@@ -76,38 +143,194 @@ def generate_subjects():
         'Economics'
     ]
     
-    insert_subject = "INSERT INTO subjects (subject_name) VALUES (%s)"
+    insert_subject = """
+    INSERT INTO subjects (subject_name) VALUES (%s)
+    ON CONFLICT (subject_name) DO NOTHING
+    """
     subjects_data = [(subject,) for subject in subjects]
     
     return insert_subject, subjects_data
 
-def generate_student_subjects(cursor, num_students):
-    print("\nGenerating student-subject relationships...")
-    
-    # Get all subject IDs
-    cursor.execute("SELECT subject_id FROM subjects")
-    subject_ids = [row[0] for row in cursor.fetchall()]
-    
-    insert_student_subject = """
-    INSERT INTO student_subjects (student_id, subject_id, grade)
-    VALUES (%s, %s, %s)
+def generate_student_subjects(subject_ids, num_students, seed=None, first_student_id=1, chunk=0):
+    """Assign each student 3-6 distinct subjects with weighted random grades."""
+    rng = make_rng(seed, SUBJECT_STREAM, chunk)
+    subject_ids = np.asarray(subject_ids)
+    max_subjects = min(6, len(subject_ids))
+
+    num_subjects = rng.integers(3, max_subjects + 1, num_students)
+
+    # Shuffle subject positions independently per student; the first
+    # num_subjects entries of each row are that student's distinct picks
+    positions = np.tile(np.arange(len(subject_ids), dtype=np.int16), (num_students, 1))
+    picks = rng.permuted(positions, axis=1)[:, :max_subjects]
+    taken = np.arange(max_subjects) < num_subjects[:, None]
+
+    total = int(num_subjects.sum())
+    return pd.DataFrame({
+        'student_id': np.repeat(
+            np.arange(first_student_id, first_student_id + num_students), num_subjects
+        ),
+        'subject_id': subject_ids[picks[taken]],
+        'grade': GRADES[rng.choice(len(GRADES), size=total, p=GRADE_WEIGHTS)],
+    }, columns=STUDENT_SUBJECT_COLUMNS)
+
+SEED_PIPELINE_DDL = """
+CREATE TABLE IF NOT EXISTS seed_runs (
+    run_id text PRIMARY KEY,
+    seed bigint NOT NULL,
+    num_students integer NOT NULL,
+    chunk_size integer NOT NULL,
+    first_student_id integer NOT NULL,
+    today date NOT NULL,
+    started_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS seed_checkpoints (
+    run_id text NOT NULL REFERENCES seed_runs (run_id) ON DELETE CASCADE,
+    chunk_index integer NOT NULL,
+    num_students integer NOT NULL,
+    num_relationships integer NOT NULL,
+    loaded_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (run_id, chunk_index)
+);
+"""
+
+# Per-process name pool, built once by the pool initializer
+_worker_name_pool = None
+
+def _init_worker(seed):
+    global _worker_name_pool
+    _worker_name_pool = build_name_pool(seed)
+
+def generate_chunk(task):
+    """Generate one chunk of students and their subjects (runs in a worker)."""
+    chunk_index, first_student_id, size, seed, today, subject_ids = task
+    students = generate_student_data(size, seed=seed, name_pool=_worker_name_pool,
+                                     today=today, chunk=chunk_index)
+    students.insert(0, 'student_id', np.arange(first_student_id, first_student_id + size))
+    student_subjects = generate_student_subjects(subject_ids, size, seed=seed,
+                                                 first_student_id=first_student_id,
+                                                 chunk=chunk_index)
+    return chunk_index, students, student_subjects
+
+def start_or_resume_run(cursor, args):
+    """Return (seed, num_students, chunk_size, first_student_id, today, done_chunks)."""
+    cursor.execute(SEED_PIPELINE_DDL)
+    cursor.execute(
+        "SELECT seed, num_students, chunk_size, first_student_id, today "
+        "FROM seed_runs WHERE run_id = %s", (args.run_id,)
+    )
+    run = cursor.fetchone()
+
+    if run is None:
+        seed = args.seed if args.seed is not None else int(np.random.SeedSequence().generate_state(1)[0])
+        cursor.execute("SELECT coalesce(max(student_id), 0) + 1 FROM students")
+        first_student_id = cursor.fetchone()[0]
+        run = (seed, args.students, args.chunk_size, first_student_id, date.today())
+        cursor.execute(
+            "INSERT INTO seed_runs (run_id, seed, num_students, chunk_size, first_student_id, today) "
+            "VALUES (%s, %s, %s, %s, %s, %s)", (args.run_id,) + run
+        )
+        print(f"\nStarting seed run '{args.run_id}' (seed={seed})")
+        return run + (set(),)
+
+    cursor.execute("SELECT chunk_index FROM seed_checkpoints WHERE run_id = %s", (args.run_id,))
+    done_chunks = {row[0] for row in cursor.fetchall()}
+    print(f"\nResuming seed run '{args.run_id}' (seed={run[0]}): "
+          f"{len(done_chunks)} chunk(s) already loaded")
+    if (args.seed is not None and args.seed != run[0]) or args.students != run[1] \
+            or args.chunk_size != run[2]:
+        print("Note: using the run's recorded seed/--students/--chunk-size, not the arguments")
+    return run + (done_chunks,)
+
+def run_pipeline(conn, args):
+    """Generate chunks on a process pool and load each one in its own transaction.
+
+    Every chunk commits together with its checkpoint row, so an interrupted
+    run restarts with the first missing chunk. At most 2 x workers chunks are
+    held in memory at once, whatever the total size.
     """
-    
-    student_subjects_data = []
-    grades = ['A', 'B', 'C', 'D', 'F']
-    
-    for student_id in tqdm(range(1, num_students + 1)):
-        # Each student takes 3-6 random subjects
-        num_subjects = random.randint(3, 6)
-        chosen_subjects = random.sample(subject_ids, num_subjects)
-        
-        for subject_id in chosen_subjects:
-            grade = random.choices(grades, weights=[0.2, 0.3, 0.3, 0.15, 0.05])[0]
-            student_subjects_data.append((student_id, subject_id, grade))
-    
-    return insert_student_subject, student_subjects_data
+    cursor = conn.cursor()
+    seed, num_students, chunk_size, first_student_id, today, done_chunks = \
+        start_or_resume_run(cursor, args)
+
+    # Generate and insert subjects
+    insert_subject, subjects_data = generate_subjects()
+    cursor.executemany(insert_subject, subjects_data)
+    cursor.execute("SELECT subject_id FROM subjects ORDER BY subject_id")
+    subject_ids = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+
+    tasks = [
+        (index, first_student_id + start, min(chunk_size, num_students - start), seed, today, subject_ids)
+        for index, start in enumerate(range(0, num_students, chunk_size))
+        if index not in done_chunks
+    ]
+    max_in_flight = args.workers * 2
+    loaded_students = loaded_relationships = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(seed,)) as executor, \
+            tqdm(total=len(tasks), desc="chunks") as progress:
+        pending = set()
+        remaining = iter(tasks)
+        while True:
+            for task in remaining:
+                pending.add(executor.submit(generate_chunk, task))
+                if len(pending) >= max_in_flight:
+                    break
+            if not pending:
+                break
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                chunk_index, students, student_subjects = future.result()
+                try:
+                    copy_rows(cursor, 'students', students, chunk_size=len(students),
+                              method=args.method, progress=False)
+                    copy_rows(cursor, 'student_subjects', student_subjects,
+                              chunk_size=len(student_subjects), method=args.method, progress=False)
+                    cursor.execute(
+                        "INSERT INTO seed_checkpoints (run_id, chunk_index, num_students, num_relationships) "
+                        "VALUES (%s, %s, %s, %s)",
+                        (args.run_id, chunk_index, len(students), len(student_subjects))
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                loaded_students += len(students)
+                loaded_relationships += len(student_subjects)
+                progress.update(1)
+
+    # Explicit ids were loaded, so move the serial past them
+    cursor.execute(
+        "SELECT setval(pg_get_serial_sequence('students', 'student_id'), "
+        "(SELECT max(student_id) FROM students))"
+    )
+    conn.commit()
+
+    elapsed = time.perf_counter() - started
+    rate = (loaded_students + loaded_relationships) / elapsed if elapsed else float('inf')
+    print(f"Loaded {loaded_students:,} students and {loaded_relationships:,} relationships "
+          f"in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    cursor.close()
 
 def main():
+    parser = argparse.ArgumentParser(description="Seed the student database")
+    parser.add_argument('--students', type=int, default=500000)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--method', choices=['copy', 'values'], default='copy',
+                        help="COPY FROM STDIN, or batched multi-row VALUES as a fallback")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for a reproducible dataset")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="processes generating chunks")
+    parser.add_argument('--run-id', default='default',
+                        help="checkpoint name; rerunning with the same id resumes it")
+    args = parser.parse_args()
+
     # Connect to database
     conn = get_database_connection()
     if conn is None:
@@ -116,23 +339,7 @@ def main():
     cursor = conn.cursor()
     
     try:
-        # Generate and insert subjects
-        print("\nInserting subjects...")
-        insert_subject, subjects_data = generate_subjects()
-        cursor.executemany(insert_subject, subjects_data)
-        
-        # Generate and insert students
-        print("\nInserting students...")
-        insert_student, students_data = generate_student_data(500000)
-        cursor.executemany(insert_student, students_data)
-        
-        # Generate and insert student-subject relationships
-        insert_student_subject, student_subjects_data = generate_student_subjects(cursor, 500000)
-        print("\nInserting student-subject relationships...")
-        cursor.executemany(insert_student_subject, student_subjects_data)
-        
-        # Commit the changes
-        conn.commit()
+        run_pipeline(conn, args)
         print("\nData generation completed successfully!")
         
         # Print some statistics
@@ -152,6 +359,7 @@ def main():
         
     except Exception as e:
         print(f"Error: {e}")
+        print("Completed chunks are committed; rerun with the same --run-id to resume.")
         conn.rollback()
     
     finally:
@@ -159,4 +367,4 @@ def main():
         conn.close()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,118 @@
+"""Concurrency load test for the Student Data API (main.py).
+
+Fires the same request first sequentially, then with N concurrent clients,
+while a probe keeps hitting ``/`` to measure event-loop responsiveness. If
+database work blocked the loop, concurrent throughput would match the
+sequential run and the probe latency would spike to the query time.
+
+/students is behind the response cache, so each request gets a unique
+``_nocache`` query parameter and reaches the database; pass --allow-cache to
+measure cache hits instead. Alternatively start the API with
+RESPONSE_CACHE_TTL=0, which turns the cache off.
+
+Usage:
+    python loadtest.py --url http://localhost:8000 --path "/students?page=1000" \
+        --requests 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def timed_get(client, path):
+    started = time.perf_counter()
+    response = await client.get(path)
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+_request_ids = itertools.count()
+
+
+def cache_busted(path):
+    # The cache keys on every query parameter; the API ignores unknown ones
+    separator = "&" if "?" in path else "?"
+    return f"{path}{separator}_nocache={next(_request_ids)}"
+
+
+async def run_batch(client, path, total, concurrency, bust_cache=True):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            return await timed_get(client, cache_busted(path) if bust_cache else path)
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    return elapsed, list(latencies)
+
+
+async def probe_loop(client, stop, latencies, interval=0.05):
+    while not stop.is_set():
+        latencies.append(await timed_get(client, "/"))
+        await asyncio.sleep(interval)
+
+
+def report(label, elapsed, latencies):
+    print(f"\n{label}")
+    print(f"- requests:   {len(latencies)}")
+    print(f"- wall time:  {elapsed:.2f}s")
+    print(f"- throughput: {len(latencies) / elapsed:.1f} req/s")
+    print(f"- latency ms: p50={percentile(latencies, 50):.1f} "
+          f"p95={percentile(latencies, 95):.1f} p99={percentile(latencies, 99):.1f}")
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        # Warm up the pool so connection setup isn't measured
+        bust_cache = not args.allow_cache
+        await run_batch(client, args.path, args.concurrency, args.concurrency, bust_cache)
+
+        seq_elapsed, seq_latencies = await run_batch(client, args.path, args.requests, 1, bust_cache)
+        report("Sequential (concurrency=1)", seq_elapsed, seq_latencies)
+
+        stop = asyncio.Event()
+        probe_latencies = []
+        probe = asyncio.create_task(probe_loop(client, stop, probe_latencies))
+        conc_elapsed, conc_latencies = await run_batch(
+            client, args.path, args.requests, args.concurrency, bust_cache
+        )
+        stop.set()
+        await probe
+        report(f"Concurrent (concurrency={args.concurrency})", conc_elapsed, conc_latencies)
+
+        print("\nEvent-loop probe (GET / during concurrent run)")
+        if probe_latencies:
+            print(f"- samples:    {len(probe_latencies)}")
+            print(f"- latency ms: median={statistics.median(probe_latencies):.1f} "
+                  f"max={max(probe_latencies):.1f}")
+
+        speedup = seq_elapsed / conc_elapsed if conc_elapsed else float("inf")
+        print(f"\nSpeedup vs sequential: {speedup:.1f}x")
+        if speedup < 1.5:
+            print("WARNING: concurrent requests appear to serialize")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/students?page=1000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--allow-cache", action="store_true",
+                        help="send identical requests, so cached paths are served from the response cache")
+    asyncio.run(main(parser.parse_args()))
@@ -1,13 +1,79 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+import hmac
 import pandas as pd
-import psycopg2
-from decouple import config
-from typing import List, Optional
+import pyarrow as pa
+from typing import List, Literal, Optional, Union
 from pydantic import BaseModel
+from decouple import config
+
+from database import Database
+from db_pool import PoolTimeout
+from fitted_transforms import FittedTransforms
+from queries import (
+    SUBJECTS_FOR_STUDENTS_QUERY,
+    build_students_export_query,
+    build_students_page_query,
+)
+from response_cache import ResponseCache
+from scoring import (
+    DEFAULT_SCORE_VERSION,
+    DEFAULT_STATUS_SCHEME,
+    STORED_SCORE_VERSION,
+    STORED_STATUS_SCHEME,
+    academic_status,
+    check_api_versions,
+    performance_score,
+    score_batch,
+)
+from search import build_search_query
+from stats import GRADE_STATS_QUERY, summarize_grade_stats
+from streaming import (
+    ARROW_MEDIA_TYPE,
+    MEDIA_TYPES,
+    PayloadError,
+    encode_chunks_async,
+    encode_scores_arrow,
+    encode_scores_json,
+    read_payload,
+)
 
 app = FastAPI()
 
+# Async data-access layer with its own bounded pool (DB_DRIVER / DB_POOL_* in .env)
+db = Database.from_env()
+
+
+@app.on_event("startup")
+async def open_database():
+    await db.open()
+
+
+@app.on_event("shutdown")
+async def close_database():
+    await db.close()
+
+# Optional ml_analysis transforms (FITTED_TRANSFORMS_PATH in .env): when set,
+# academic_status and performance_score follow the fitted pipeline
+TRANSFORMS_PATH = config('FITTED_TRANSFORMS_PATH', default='')
+transforms = FittedTransforms.load(TRANSFORMS_PATH) if TRANSFORMS_PATH else None
+
+# Scoring formula and status scheme versions (see scoring.py); the stored
+# columns are used when they match
+SCORE_VERSION = config('SCORE_VERSION', default=DEFAULT_SCORE_VERSION)
+STATUS_SCHEME = config('STATUS_SCHEME', default=DEFAULT_STATUS_SCHEME)
+# Fail at startup, not on the first request
+check_api_versions(SCORE_VERSION, STATUS_SCHEME)
+USE_STORED_SCORE = SCORE_VERSION == STORED_SCORE_VERSION
+USE_STORED_STATUS = STATUS_SCHEME == STORED_STATUS_SCHEME
+
+# Cache the dashboard's read endpoints (RESPONSE_CACHE_* in .env)
+response_cache = ResponseCache.from_env(
+    paths=["/students", "/students/stats", "/students/search"]
+)
+response_cache.install(app)
+
 # Enable CORS
 app.add_middleware(
     CORSMiddleware,
@@ -31,150 +97,261 @@ class Student(BaseModel):
     academic_status: str
     performance_score: float
 
-def get_database_connection():
-    return psycopg2.connect(
-        dbname=config('DB_NAME'),
-        user=config('DB_USER'),
-        password=config('DB_PASSWORD'),
-        host=config('DB_HOST'),
-        port=config('DB_PORT')
-    )
+class SearchMatch(BaseModel):
+    student_id: int
+    name: str
+    score: float
+
+class StudentPage(BaseModel):
+    students: List[Student]
+    next_cursor: Optional[int] = None
 
 @app.get("/")
 def read_root():
     return {"message": "Student Data API"}
 
-@app.get("/students", response_model=List[Student])
+@app.get("/health/db")
+async def database_health():
+    try:
+        latency_ms = await db.check()
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {e}")
+    return {"status": "ok", "latency_ms": latency_ms, **db.stats()}
+
+@app.get("/health/db/pool")
+def database_pool_stats():
+    return db.stats()
+
+@app.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
+
+# Shared secret for POST /cache/invalidate; the endpoint is disabled when unset
+CACHE_ADMIN_TOKEN = config('CACHE_ADMIN_TOKEN', default='')
+
+@app.post("/cache/invalidate")
+def invalidate_cache(prefix: str = "", x_cache_admin_token: str = Header(default="")):
+    if not CACHE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Cache invalidation is disabled")
+    if not hmac.compare_digest(x_cache_admin_token.encode(), CACHE_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid cache admin token")
+    if prefix and not any(prefix.startswith(path) for path in response_cache.paths):
+        raise HTTPException(status_code=400, detail="Prefix must start with a cached path")
+    return {"invalidated": response_cache.invalidate(prefix)}
+
+@app.get("/students", response_model=Union[List[Student], StudentPage])
 async def get_students(
     page: int = 1, 
     limit: int = 10,
     search: Optional[str] = None,
     min_gpa: Optional[float] = None,
-    max_gpa: Optional[float] = None
+    max_gpa: Optional[float] = None,
+    after_id: Optional[int] = None
 ):
+    """List students.
+
+    Pass ``after_id`` (0 for the first page) to switch from page/limit to
+    keyset pagination: the response then wraps the rows with a
+    ``next_cursor`` to send as the next ``after_id``, or null on the last page.
+    """
     try:
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
-        # Base query
-        query = """
-        SELECT 
-            s.*,
-            array_agg(DISTINCT sub.subject_name) as subjects,
-            array_agg(DISTINCT ss.grade) as grades
-        FROM students s
-        LEFT JOIN student_subjects ss ON s.student_id = ss.student_id
-        LEFT JOIN subjects sub ON ss.subject_id = sub.subject_id
-        """
-        
-        # Add WHERE clauses based on filters
-        where_clauses = []
-        params = []
-        
-        if search:
-            where_clauses.append("s.name ILIKE %s")
-            params.append(f"%{search}%")
-            
-        if min_gpa is not None:
-            where_clauses.append("s.gpa >= %s")
-            params.append(min_gpa)
-            
-        if max_gpa is not None:
-            where_clauses.append("s.gpa <= %s")
-            params.append(max_gpa)
-            
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
-            
-        # Add GROUP BY and pagination
-        query += """
-        GROUP BY s.student_id, s.name, s.age, s.grade_level, 
-                 s.enrollment_date, s.gpa, s.attendance_rate
-        ORDER BY s.student_id
-        LIMIT %s OFFSET %s
-        """
-        
-        # Add pagination parameters
-        params.extend([limit, (page - 1) * limit])
-        
-        # Execute query
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        # Convert to list of dictionaries
-        students = []
-        for row in rows:
-            student = {
-                "student_id": row[0],
-                "name": row[1],
-                "age": row[2],
-                "grade_level": row[3],
-                "enrollment_date": str(row[4]),
-                "gpa": float(row[5]) if row[5] else None,
-                "attendance_rate": float(row[6]) if row[6] else None,
-                "subjects": row[7] if row[7] else [],
-                "grades": row[8] if row[8] else [],
-                "academic_status": get_academic_status(row[5]),
-                "performance_score": calculate_performance_score(row[5], row[6])
-            }
-            students.append(student)
-            
-        return students
-        
+        # Page of students first, then subjects/grades for just those ids
+        query, params = build_students_page_query(page, limit, search, min_gpa, max_gpa, after_id)
+        rows = await db.fetch(query, params)
+        subjects = await fetch_subjects(rows)
+        students = [student_from_row(row, subjects.get(row[0])) for row in rows]
+
+        if after_id is None:
+            return students
+
+        next_cursor = students[-1]["student_id"] if len(students) == limit else None
+        return {"students": students, "next_cursor": next_cursor}
+
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-        
-    finally:
-        conn.close()
-
-def get_academic_status(gpa):
-    if gpa is None:
-        return "Unknown"
-    gpa = float(gpa)
-    if gpa >= 3.5:
-        return "Excellent"
-    elif gpa >= 3.0:
-        return "Good"
-    elif gpa >= 2.5:
-        return "Fair"
+
+async def fetch_subjects(rows):
+    if not rows:
+        return {}
+    student_ids = [row[0] for row in rows]
+    subject_rows = await db.fetch(SUBJECTS_FOR_STUDENTS_QUERY, [student_ids])
+    return {row[0]: (row[1], row[2]) for row in subject_rows}
+
+def student_from_row(row, subjects=None):
+    subject_names, grades = subjects or ([], [])
+    if transforms is not None:
+        scored = transforms.transform_record({"gpa": row[5], "attendance_rate": row[6]})
+        status = scored["academic_status"] or "Unknown"
+        score = scored["performance_score"]
     else:
-        return "Poor"
+        status = row[8] if USE_STORED_STATUS else academic_status(row[5], STATUS_SCHEME)
+        if USE_STORED_SCORE:
+            score = float(row[7]) if row[7] is not None else None
+        else:
+            score = performance_score({"gpa": row[5], "attendance_rate": row[6]}, SCORE_VERSION)
+    return {
+        "student_id": row[0],
+        "name": row[1],
+        "age": row[2],
+        "grade_level": row[3],
+        "enrollment_date": str(row[4]),
+        "gpa": float(row[5]) if row[5] else None,
+        "attendance_rate": float(row[6]) if row[6] else None,
+        "subjects": subject_names or [],
+        "grades": grades or [],
+        "academic_status": status,
+        "performance_score": score
+    }
+
+# Fixed so every chunk (and an empty export) has the same Arrow schema
+EXPORT_ARROW_SCHEMA = pa.schema([
+    ("student_id", pa.int64()),
+    ("name", pa.string()),
+    ("age", pa.int64()),
+    ("grade_level", pa.int64()),
+    ("enrollment_date", pa.string()),
+    ("gpa", pa.float64()),
+    ("attendance_rate", pa.float64()),
+    ("subjects", pa.list_(pa.string())),
+    ("grades", pa.list_(pa.string())),
+    ("academic_status", pa.string()),
+    ("performance_score", pa.float64()),
+])
+
+async def export_frames(row_chunks):
+    async for rows in row_chunks:
+        # Subjects and grades are the last two columns of the export query
+        frame = pd.DataFrame.from_records(
+            [student_from_row(row, (row[9], row[10])) for row in rows],
+            columns=EXPORT_ARROW_SCHEMA.names,
+        )
+        yield frame
+
+@app.get("/students/export")
+async def export_students(
+    format: Literal["ndjson", "csv", "arrow"] = "ndjson",
+    search: Optional[str] = None,
+    min_gpa: Optional[float] = None,
+    max_gpa: Optional[float] = None,
+    chunk_size: int = Query(5000, ge=100, le=50000)
+):
+    """Stream every matching student from a server-side cursor.
+
+    Memory stays at one chunk however many rows match. Not cached: the
+    response cache would buffer the whole body.
+    """
+    query, params = build_students_export_query(search, min_gpa, max_gpa)
+    row_chunks = db.stream(query, params, chunk_size)
+
+    # Pull the first chunk up front so pool and query errors still get a
+    # proper status code instead of a truncated 200
+    try:
+        first = await row_chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def all_chunks():
+        if first is None:
+            return
+        yield first
+        async for rows in row_chunks:
+            yield rows
+
+    options = {"schema": EXPORT_ARROW_SCHEMA} if format == "arrow" else {}
+    return StreamingResponse(
+        encode_chunks_async(export_frames(all_chunks()), format, **options),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="students.{format}"'},
+    )
 
-def calculate_performance_score(gpa, attendance):
-    if gpa is None or attendance is None:
-        return None
-    return (float(gpa) * 0.7) + (float(attendance) * 0.3)
+SCORE_MAX_RECORDS = config('SCORE_MAX_RECORDS', default=200000, cast=int)
+# Bodies are refused past this many bytes, before they are buffered
+SCORE_MAX_BYTES = config('SCORE_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+
+async def read_body(request: Request, max_bytes: int) -> bytes:
+    """The request body, or a 413 as soon as it is known to exceed ``max_bytes``."""
+    too_large = HTTPException(status_code=413, detail=f"At most {max_bytes} bytes per request")
+    length = request.headers.get("content-length")
+    if length is not None:
+        try:
+            if int(length) > max_bytes:
+                raise too_large
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    # Chunked bodies have no length up front, so count as they arrive
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+@app.post("/students/score")
+async def score_students(request: Request):
+    """Score a batch of students in one vectorized pass.
+
+    The body is JSON, either columnar (``{"gpa": [...], "attendance_rate":
+    [...]}``) or records (a list of objects), or an Arrow IPC stream
+    (``Content-Type: application/vnd.apache.arrow.stream``). Send
+    ``Accept: application/vnd.apache.arrow.stream`` to get Arrow back.
+    """
+    body = await read_body(request, SCORE_MAX_BYTES)
+    try:
+        columns = read_payload(body, request.headers.get("content-type", ""))
+    except PayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    count = len(columns["gpa"])
+    if count > SCORE_MAX_RECORDS:
+        raise HTTPException(status_code=413, detail=f"At most {SCORE_MAX_RECORDS} records per request")
+
+    scores = score_batch(columns, transforms, SCORE_VERSION, STATUS_SCHEME)
+    if ARROW_MEDIA_TYPE in request.headers.get("accept", ""):
+        return Response(encode_scores_arrow(scores), media_type=ARROW_MEDIA_TYPE)
+    return Response(encode_scores_json(scores), media_type="application/json")
+
+@app.get("/students/search", response_model=List[SearchMatch])
+async def search_students(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=100),
+    mode: Literal["substring", "prefix"] = "substring"
+):
+    """Ranked name search; ``mode=prefix`` is meant for typeahead."""
+    try:
+        query, params = build_search_query(q, limit, mode)
+        rows = await db.fetch(query, params)
+        return [
+            {"student_id": row[0], "name": row[1], "score": float(row[2])}
+            for row in rows
+        ]
+
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/students/stats")
 async def get_stats():
+    # Served from the trigger-maintained per-grade summary, not a table scan
     try:
-        conn = get_database_connection()
-        cursor = conn.cursor()
-        
-        # Get basic statistics
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_students,
-                AVG(gpa) as avg_gpa,
-                AVG(attendance_rate) as avg_attendance,
-                COUNT(DISTINCT grade_level) as grade_levels
-            FROM students
-        """)
-        
-        stats = cursor.fetchone()
-        
-        return {
-            "total_students": stats[0],
-            "average_gpa": float(stats[1]) if stats[1] else None,
-            "average_attendance": float(stats[2]) if stats[2] else None,
-            "grade_levels": stats[3]
-        }
-        
+        rows = await db.fetch(GRADE_STATS_QUERY)
+        return summarize_grade_stats(rows)
+
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-        
-    finally:
-        conn.close()
 
 if __name__ == "__main__":
     import uvicorn
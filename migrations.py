@@ -0,0 +1,316 @@
+"""Versioned schema migrations for the student database.
+
+Usage:
+    python migrations.py migrate   # apply pending migrations in order
+    python migrations.py status    # list applied and pending migrations
+    python migrations.py verify    # EXPLAIN the API queries, fail on seq scans
+
+Applied versions are recorded in ``schema_migrations``. Migrations marked
+non-transactional (CREATE INDEX CONCURRENTLY) run in autocommit mode and are
+written with IF NOT EXISTS so a rerun after a failure is safe.
+"""
+import json
+import sys
+
+from decouple import config
+import psycopg2
+
+from queries import SUBJECTS_FOR_STUDENTS_QUERY, build_students_page_query
+from search import build_search_query
+
+
+CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS subjects (
+    subject_id serial PRIMARY KEY,
+    subject_name varchar(100) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS students (
+    student_id serial PRIMARY KEY,
+    name varchar(100) NOT NULL,
+    age smallint NOT NULL,
+    grade_level smallint NOT NULL,
+    enrollment_date date NOT NULL,
+    gpa numeric(3, 2) CHECK (gpa BETWEEN 0 AND 4),
+    attendance_rate numeric(3, 2) CHECK (attendance_rate BETWEEN 0 AND 1)
+);
+
+CREATE TABLE IF NOT EXISTS student_subjects (
+    student_id integer NOT NULL REFERENCES students (student_id) ON DELETE CASCADE,
+    subject_id integer NOT NULL REFERENCES subjects (subject_id),
+    grade char(1) NOT NULL CHECK (grade IN ('A', 'B', 'C', 'D', 'F')),
+    PRIMARY KEY (student_id, subject_id)
+);
+"""
+
+ACCESS_PATTERN_INDEXES = [
+    # /students min_gpa/max_gpa range filters
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS students_gpa_idx "
+    "ON students (gpa, student_id)",
+    # Batched subjects/grades lookup by student id, answered from the index alone
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS student_subjects_student_covering_idx "
+    "ON student_subjects (student_id) INCLUDE (subject_id, grade)",
+    # Foreign-key side of student_subjects -> subjects
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS student_subjects_subject_idx "
+    "ON student_subjects (subject_id)",
+]
+
+# Migrations 3-5 keep their SQL as applied, not imported from the modules
+# that use the tables: editing stats.py, search.py or scoring.py must not
+# change a migration that has already run. Changes need a new migration.
+
+# Running per-grade aggregates behind /students/stats (see stats.py)
+GRADE_STATS_DDL = """
+CREATE TABLE IF NOT EXISTS student_grade_stats (
+    grade_level integer PRIMARY KEY,
+    student_count bigint NOT NULL DEFAULT 0,
+    gpa_count bigint NOT NULL DEFAULT 0,
+    gpa_sum numeric NOT NULL DEFAULT 0,
+    attendance_count bigint NOT NULL DEFAULT 0,
+    attendance_sum numeric NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION student_grade_stats_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO student_grade_stats AS t (grade_level, student_count, gpa_count, gpa_sum,
+                                              attendance_count, attendance_sum, updated_at)
+        SELECT grade_level, -count(*), -count(gpa), -coalesce(sum(gpa), 0),
+               -count(attendance_rate), -coalesce(sum(attendance_rate), 0), now()
+        FROM old_rows
+        GROUP BY grade_level
+        ON CONFLICT (grade_level) DO UPDATE SET
+            student_count = t.student_count + EXCLUDED.student_count,
+            gpa_count = t.gpa_count + EXCLUDED.gpa_count,
+            gpa_sum = t.gpa_sum + EXCLUDED.gpa_sum,
+            attendance_count = t.attendance_count + EXCLUDED.attendance_count,
+            attendance_sum = t.attendance_sum + EXCLUDED.attendance_sum,
+            updated_at = EXCLUDED.updated_at;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO student_grade_stats AS t (grade_level, student_count, gpa_count, gpa_sum,
+                                              attendance_count, attendance_sum, updated_at)
+        SELECT grade_level, count(*), count(gpa), coalesce(sum(gpa), 0),
+               count(attendance_rate), coalesce(sum(attendance_rate), 0), now()
+        FROM new_rows
+        GROUP BY grade_level
+        ON CONFLICT (grade_level) DO UPDATE SET
+            student_count = t.student_count + EXCLUDED.student_count,
+            gpa_count = t.gpa_count + EXCLUDED.gpa_count,
+            gpa_sum = t.gpa_sum + EXCLUDED.gpa_sum,
+            attendance_count = t.attendance_count + EXCLUDED.attendance_count,
+            attendance_sum = t.attendance_sum + EXCLUDED.attendance_sum,
+            updated_at = EXCLUDED.updated_at;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION student_grade_stats_truncate() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM student_grade_stats;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS student_grade_stats_insert ON students;
+CREATE TRIGGER student_grade_stats_insert
+    AFTER INSERT ON students
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_grade_stats_apply();
+
+DROP TRIGGER IF EXISTS student_grade_stats_update ON students;
+CREATE TRIGGER student_grade_stats_update
+    AFTER UPDATE ON students
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_grade_stats_apply();
+
+DROP TRIGGER IF EXISTS student_grade_stats_delete ON students;
+CREATE TRIGGER student_grade_stats_delete
+    AFTER DELETE ON students
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_grade_stats_apply();
+
+DROP TRIGGER IF EXISTS student_grade_stats_truncate ON students;
+CREATE TRIGGER student_grade_stats_truncate
+    AFTER TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION student_grade_stats_truncate();
+"""
+
+# Initial fill; stats.py rebuild runs the same recompute
+GRADE_STATS_BACKFILL = """
+LOCK TABLE students IN SHARE MODE;
+DELETE FROM student_grade_stats;
+INSERT INTO student_grade_stats (grade_level, student_count, gpa_count, gpa_sum,
+                                 attendance_count, attendance_sum, updated_at)
+SELECT grade_level, count(*), count(gpa), coalesce(sum(gpa), 0),
+       count(attendance_rate), coalesce(sum(attendance_rate), 0), now()
+FROM students
+GROUP BY grade_level;
+"""
+
+# Name search indexes (see search.py); one statement per entry, as CREATE
+# INDEX CONCURRENTLY can't share a transaction
+NAME_SEARCH_INDEXES = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS students_name_trgm_idx "
+    "ON students USING gist (name gist_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS students_name_prefix_idx "
+    "ON students (lower(name) text_pattern_ops)",
+]
+
+# Scored once on write instead of per request: scoring.py's api-v1 formula
+# and status scheme
+STORED_SCORES = """
+ALTER TABLE students
+    ADD COLUMN IF NOT EXISTS performance_score numeric
+        GENERATED ALWAYS AS ((gpa * 0.7 + attendance_rate * 0.3)) STORED,
+    ADD COLUMN IF NOT EXISTS academic_status text
+        GENERATED ALWAYS AS (CASE WHEN gpa IS NULL THEN 'Unknown' WHEN gpa >= 3.5 THEN 'Excellent' WHEN gpa >= 3.0 THEN 'Good' WHEN gpa >= 2.5 THEN 'Fair' ELSE 'Poor' END) STORED
+"""
+
+# (version, name, statements, transactional)
+MIGRATIONS = [
+    (1, "create_tables", [CREATE_TABLES], True),
+    (2, "access_pattern_indexes", ACCESS_PATTERN_INDEXES, False),
+    (3, "grade_stats", [GRADE_STATS_DDL, GRADE_STATS_BACKFILL], True),
+    (4, "name_search_indexes", NAME_SEARCH_INDEXES, False),
+    (5, "stored_scores", [STORED_SCORES], True),
+]
+
+SCHEMA_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version integer PRIMARY KEY,
+    name text NOT NULL,
+    applied_at timestamptz NOT NULL DEFAULT now()
+)
+"""
+
+
+def get_database_connection():
+    return psycopg2.connect(
+        dbname=config('DB_NAME'),
+        user=config('DB_USER'),
+        password=config('DB_PASSWORD'),
+        host=config('DB_HOST', default='localhost'),
+        port=config('DB_PORT', default='5432')
+    )
+
+
+def applied_versions(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(SCHEMA_MIGRATIONS_DDL)
+        cursor.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cursor.fetchall()}
+    conn.commit()
+    return versions
+
+
+def apply_migration(conn, version, name, statements, transactional):
+    conn.autocommit = not transactional
+    try:
+        with conn.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+        if transactional:
+            conn.commit()
+    except Exception:
+        if transactional:
+            conn.rollback()
+        raise
+    finally:
+        conn.autocommit = False
+
+
+def migrate(conn):
+    done = applied_versions(conn)
+    pending = [m for m in MIGRATIONS if m[0] not in done]
+    if not pending:
+        print("Schema is up to date.")
+        return
+    for version, name, statements, transactional in pending:
+        print(f"Applying {version:04d}_{name}...")
+        apply_migration(conn, version, name, statements, transactional)
+    print(f"\nApplied {len(pending)} migration(s) successfully!")
+
+
+def status(conn):
+    done = applied_versions(conn)
+    for version, name, _, _ in MIGRATIONS:
+        state = "applied" if version in done else "pending"
+        print(f"{version:04d}_{name}: {state}")
+
+
+def plan_scans(plan):
+    """Yield (node type, relation) for every scan node in an EXPLAIN JSON plan."""
+    node_type = plan.get("Node Type", "")
+    if node_type.endswith("Scan"):
+        yield node_type, plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from plan_scans(child)
+
+
+# (description, (query, params), tables that must not be sequentially scanned)
+def verification_cases():
+    return [
+        ("/students?min_gpa=3.9&max_gpa=4.0",
+         build_students_page_query(min_gpa=3.9, max_gpa=4.0), {"students"}),
+        ("/students?page=1000",
+         build_students_page_query(page=1000), {"students"}),
+        ("/students keyset after_id=250000",
+         build_students_page_query(after_id=250000), {"students"}),
+        ("subjects/grades batch lookup",
+         (SUBJECTS_FOR_STUDENTS_QUERY, [list(range(1, 11))]), {"student_subjects"}),
+        ("/students/search?q=smith",
+         build_search_query("smith"), {"students"}),
+        ("/students/search?q=jo&mode=prefix",
+         build_search_query("jo", mode="prefix"), {"students"}),
+    ]
+
+
+def verify(conn):
+    failures = 0
+    with conn.cursor() as cursor:
+        cursor.execute("ANALYZE students")
+        cursor.execute("ANALYZE student_subjects")
+        for description, (query, params), tables in verification_cases():
+            cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scans = list(plan_scans(plan[0]["Plan"]))
+            seq_scans = [rel for node, rel in scans if node == "Seq Scan" and rel in tables]
+            ok = not seq_scans
+            failures += not ok
+            used = ", ".join(f"{node} on {rel}" for node, rel in scans if rel)
+            print(f"[{'PASS' if ok else 'FAIL'}] {description}: {used}")
+    conn.rollback()
+
+    if failures:
+        print(f"\n{failures} query plan(s) fell back to sequential scans")
+        sys.exit(1)
+    print("\nAll API queries use index scans.")
+
+
+def main():
+    commands = {"migrate": migrate, "status": status, "verify": verify}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        print(__doc__)
+        sys.exit(1)
+
+    conn = get_database_connection()
+    try:
+        commands[sys.argv[1]](conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
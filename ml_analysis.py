@@ -3,10 +3,18 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.impute import SimpleImputer
-import seaborn as sns
-import matplotlib.pyplot as plt
 from datetime import datetime
-import os
+import argparse
+
+from pipeline_io import run_stage, write_parquet
+from fitted_transforms import FittedTransforms
+from ml_partitioned import compare_frames, run_partitioned
+from plotting import box_plot, histogram, render_figures, scatter
+from schema import build_frame
+from scoring import performance_score
+
+OUTPUT_PATH = 'processed_student_data.parquet'
+TRANSFORMS_PATH = 'fitted_transforms.json'
 
 def load_and_analyze_data():
     # 1. Generate and Return 500,000 rows of data
@@ -31,7 +39,7 @@ def load_and_analyze_data():
     data['gpa'] = [None if np.random.random() < 0.05 else x for x in data['gpa']]
     data['attendance_rate'] = [None if np.random.random() < 0.05 else x for x in data['attendance_rate']]
     
-    df = pd.DataFrame(data)
+    df = build_frame(data)
     return df
 
 def describe_dataset(df):
@@ -95,66 +103,83 @@ def create_features(df):
                             labels=['Junior', 'Intermediate', 'Senior'])
     
     # Create performance score
-    df['performance_score'] = (df['gpa'] + df['attendance_rate']) / 2
+    df['performance_score'] = performance_score(df, 'ml-v1')
     
     return df
 
 def create_visualizations(df):
-    # Create a directory for plots if it doesn't exist
-    if not os.path.exists('plots'):
-        os.makedirs('plots')
-    
-    # Set the style
-    plt.style.use('seaborn')
-    
-    # 1. Distribution of GPA
-    plt.figure(figsize=(10, 6))
-    sns.histplot(data=df, x='gpa', bins=50)
-    plt.title('Distribution of GPA')
-    plt.savefig('plots/gpa_distribution.png')
-    plt.close()
-    
-    # 2. Attendance Rate vs GPA
-    plt.figure(figsize=(10, 6))
-    sns.scatterplot(data=df.sample(1000), x='gpa', y='attendance_rate')
-    plt.title('Attendance Rate vs GPA')
-    plt.savefig('plots/attendance_vs_gpa.png')
-    plt.close()
-    
-    # 3. Age Distribution by Academic Status
-    plt.figure(figsize=(12, 6))
-    sns.boxplot(data=df, x='academic_status', y='age')
-    plt.title('Age Distribution by Academic Status')
-    plt.savefig('plots/age_by_academic_status.png')
-    plt.close()
-    
-    # 4. Performance Score Distribution
-    plt.figure(figsize=(10, 6))
-    sns.histplot(data=df, x='performance_score', bins=50)
-    plt.title('Distribution of Performance Scores')
-    plt.savefig('plots/performance_distribution.png')
-    plt.close()
+    # Statistics are aggregated here; plotting.render_figures draws them in parallel
+    figures = [
+        histogram('gpa_distribution', df['gpa'], 'Distribution of GPA', 'gpa'),
+        scatter('attendance_vs_gpa', df['gpa'], df['attendance_rate'],
+                'Attendance Rate vs GPA', 'gpa', 'attendance_rate'),
+        box_plot('age_by_academic_status', df['age'], df['academic_status'],
+                 'Age Distribution by Academic Status', 'academic_status', 'age',
+                 figsize=(12, 6)),
+        histogram('performance_distribution', df['performance_score'],
+                  'Distribution of Performance Scores', 'performance_score'),
+    ]
+    return render_figures(figures, 'plots')
 
-def main():
-    # Load data
-    print("Loading dataset...")
-    df = load_and_analyze_data()
-    
-    # Describe dataset
-    print("\nAnalyzing dataset...")
-    description = describe_dataset(df)
-    
+def run_single_process(df):
     # Handle null values
     print("\nHandling null values...")
-    df = handle_null_values(df)
+    df = run_stage('handle_null_values', handle_null_values, df)
     
     # Preprocess data
     print("\nPreprocessing data...")
-    df = preprocess_data(df)
+    df = run_stage('preprocess_data', preprocess_data, df)
     
     # Create features
     print("\nCreating new features...")
-    df = create_features(df)
+    df = run_stage('create_features', create_features, df)
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description="Student ML feature pipeline")
+    parser.add_argument('--partitions', type=int, default=None,
+                        help="split the data into this many partitions and process them in parallel")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for --partitions (default: CPU count)")
+    parser.add_argument('--check', action='store_true',
+                        help="with --partitions, compare against the single-process result")
+    parser.add_argument('--transforms', default=TRANSFORMS_PATH,
+                        help="where the fitted imputer/scaler/bin parameters are saved")
+    parser.add_argument('--reuse-transforms', action='store_true',
+                        help="apply the saved transforms instead of refitting on this data")
+    args = parser.parse_args()
+    
+    # Load data
+    print("Loading dataset...")
+    df = run_stage('load_and_analyze_data', load_and_analyze_data, None,
+                   key_extra=str(datetime.now().date()))
+    
+    # Describe dataset
+    print("\nAnalyzing dataset...")
+    description = describe_dataset(df)
+    
+    if args.reuse_transforms:
+        print(f"\nApplying saved transforms from '{args.transforms}'...")
+        transforms = FittedTransforms.load(args.transforms)
+        df = transforms.transform(df)
+    elif args.partitions:
+        print(f"\nRunning null handling, preprocessing and features on {args.partitions} partitions...")
+        result, transforms = run_partitioned(df, partitions=args.partitions, workers=args.workers)
+        if args.check:
+            report = compare_frames(run_single_process(df), result)
+            for column, outcome in report.items():
+                print(f"{column}: {outcome}")
+            print("Partitioned output matches" if all(o['match'] for o in report.values())
+                  else "Partitioned output DIFFERS from the single-process result")
+        df = result
+    else:
+        # Same parameters the sklearn stages fit, kept for scoring new students
+        transforms = FittedTransforms.fit(df)
+        df = run_single_process(df)
+    
+    if not args.reuse_transforms:
+        transforms.save(args.transforms)
+        print(f"Fitted transforms saved to '{args.transforms}'")
     
     print("\nCreating visualizations...")
     create_visualizations(df)
@@ -162,7 +187,8 @@ def main():
     
     # Save processed dataset
     print("\nSaving processed dataset...")
-    df.to_csv('processed_student_data.csv', index=False)
+    write_parquet(df, OUTPUT_PATH)
+    print(f"Data saved to '{OUTPUT_PATH}'")
     
     # Print final shape
     print(f"\nFinal dataset shape: {df.shape}")
@@ -0,0 +1,274 @@
+"""Partitioned, multi-core version of the ml_analysis feature stages.
+
+The frame is split into row partitions, and each one is written as an Arrow
+snapshot that worker processes memory-map. The stages then run in passes
+over the partitions on a process pool:
+
+1. moments: mergeable count/mean/M2/min/max of gpa, attendance_rate and
+   age, plus the earliest enrollment date.
+2. histograms: moments of days_enrolled (which needs the earliest date) and
+   fixed-edge histograms of gpa and attendance_rate, imputed values included.
+3. refine: the few values inside the histogram bins that hold the quantile
+   ranks, which turns the approximate quantiles into exact ones.
+4. apply: FittedTransforms.transform on every partition in parallel.
+
+Passes 1-3 only ship summaries back to the parent, so memory stays at one
+partition per worker. compare_frames checks the result against the
+single-process pipeline.
+"""
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from fitted_transforms import (
+    ACADEMIC_QUANTILES,
+    ATTENDANCE_QUANTILES,
+    SCALED_COLUMNS,
+    FittedTransforms,
+)
+from pipeline_io import SNAPSHOT_DIR, load_snapshot, save_snapshot
+
+
+HISTOGRAM_BINS = 4096
+
+QUANTILE_COLUMNS = {'gpa': ACADEMIC_QUANTILES, 'attendance_rate': ATTENDANCE_QUANTILES}
+
+
+class Moments:
+    """Count, mean, M2, min and max of a column; partials merge exactly."""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, minimum=np.inf, maximum=-np.inf, nulls=0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+        self.nulls = nulls
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values, dtype=np.float64)
+        valid = values[~np.isnan(values)]
+        nulls = len(values) - len(valid)
+        if not len(valid):
+            return cls(nulls=nulls)
+        mean = valid.mean()
+        return cls(len(valid), mean, float(((valid - mean) ** 2).sum()),
+                   valid.min(), valid.max(), nulls)
+
+    def merge(self, other):
+        count = self.count + other.count
+        if count == 0:
+            return Moments(nulls=self.nulls + other.nulls)
+        # Chan et al. pairwise update
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        return Moments(count, mean, m2, min(self.min, other.min), max(self.max, other.max),
+                       self.nulls + other.nulls)
+
+    def scale(self, imputed=False):
+        """Population std as StandardScaler computes it, 1.0 for constant columns.
+
+        With ``imputed`` the nulls count as rows holding the mean, which
+        leaves the mean and M2 unchanged but grows the count.
+        """
+        count = self.count + (self.nulls if imputed else 0)
+        std = np.sqrt(self.m2 / count) if count else 0.0
+        return std if std > 0 else 1.0
+
+
+def merge_all(items):
+    total = Moments()
+    for item in items:
+        total = total.merge(item)
+    return total
+
+
+def bin_index(values, edges):
+    # The same binning in the histogram and refine passes, so ranks line up
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+
+
+def _imputed(values, fill):
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), fill, values)
+
+
+def _days_enrolled(dates, origin):
+    return (pd.to_datetime(dates) - origin).dt.days.to_numpy(dtype=np.float64)
+
+
+def _moments_pass(path):
+    part = load_snapshot(path)
+    return {
+        'gpa': Moments.from_values(part['gpa']),
+        'attendance_rate': Moments.from_values(part['attendance_rate']),
+        'age': Moments.from_values(part['age']),
+        'min_date': pd.to_datetime(part['enrollment_date']).min(),
+    }
+
+
+def _histogram_pass(path, plan):
+    part = load_snapshot(path)
+    result = {'days_enrolled': Moments.from_values(_days_enrolled(part['enrollment_date'], plan['min_date']))}
+    for column in QUANTILE_COLUMNS:
+        values = _imputed(part[column], plan['fill'][column])
+        edges = plan['edges'][column]
+        result[column] = np.bincount(bin_index(values, edges), minlength=len(edges) - 1)
+    return result
+
+
+def _refine_pass(path, plan):
+    part = load_snapshot(path)
+    result = {}
+    for column in QUANTILE_COLUMNS:
+        values = _imputed(part[column], plan['fill'][column])
+        wanted = np.isin(bin_index(values, plan['edges'][column]), plan['bins'][column])
+        result[column] = values[wanted]
+    return result
+
+
+def _apply_pass(path, params, output_path):
+    df = FittedTransforms.from_params(params).transform(load_snapshot(path))
+    save_snapshot(df, output_path)
+    return output_path
+
+
+def _lerp(low, high, fraction):
+    # numpy's linear quantile interpolation
+    diff = high - low
+    return high - diff * (1 - fraction) if fraction >= 0.5 else low + diff * fraction
+
+
+def _quantile_ranks(total, quantiles):
+    positions = [q * (total - 1) for q in quantiles]
+    return positions, sorted({min(int(np.floor(p)) + step, total - 1)
+                              for p in positions for step in (0, 1)})
+
+
+def exact_quantiles(counts, edges, gathered, quantiles):
+    """Quantiles from merged bin counts plus the sorted values of the needed bins."""
+    total = int(counts.sum())
+    cumulative = np.cumsum(counts)
+    values = np.sort(gathered)
+    # Every gathered bin is complete, so ranks inside them are known exactly
+    value_bins = bin_index(values, edges)
+    bins = np.unique(value_bins)
+    offsets = {b: int(cumulative[b] - counts[b]) for b in bins}
+    starts = {b: int(np.searchsorted(value_bins, b, side='left')) for b in bins}
+
+    def order_statistic(rank):
+        b = int(np.searchsorted(cumulative, rank, side='right'))
+        return values[starts[b] + rank - offsets[b]]
+
+    positions, _ = _quantile_ranks(total, quantiles)
+    result = []
+    for position in positions:
+        low_rank = int(np.floor(position))
+        high_rank = min(low_rank + 1, total - 1)
+        result.append(_lerp(order_statistic(low_rank), order_statistic(high_rank), position - low_rank))
+    return np.array(result)
+
+
+def fit_params(paths, pool):
+    """The imputer, scaler and quantile parameters of the whole dataset."""
+    partials = list(pool.map(_moments_pass, paths))
+    moments = {column: merge_all(p[column] for p in partials) for column in ('gpa', 'attendance_rate', 'age')}
+    fill = {column: moments[column].mean for column in QUANTILE_COLUMNS}
+    plan = {
+        'fill': fill,
+        'min_date': min(p['min_date'] for p in partials),
+        'edges': {
+            column: np.linspace(moments[column].min, moments[column].max, HISTOGRAM_BINS + 1)
+            for column in QUANTILE_COLUMNS
+        },
+    }
+
+    partials = list(pool.map(_histogram_pass, paths, [plan] * len(paths)))
+    moments['days_enrolled'] = merge_all(p['days_enrolled'] for p in partials)
+    counts = {column: sum(p[column] for p in partials) for column in QUANTILE_COLUMNS}
+
+    # Bins holding the order statistics each quantile interpolates between
+    plan['bins'] = {}
+    for column, quantiles in QUANTILE_COLUMNS.items():
+        cumulative = np.cumsum(counts[column])
+        _, ranks = _quantile_ranks(int(cumulative[-1]), quantiles)
+        plan['bins'][column] = np.unique(np.searchsorted(cumulative, ranks, side='right'))
+
+    partials = list(pool.map(_refine_pass, paths, [plan] * len(paths)))
+    raw_bins = {
+        column: exact_quantiles(counts[column], plan['edges'][column],
+                                np.concatenate([p[column] for p in partials]), quantiles)
+        for column, quantiles in QUANTILE_COLUMNS.items()
+    }
+
+    mean = {column: moments[column].mean for column in SCALED_COLUMNS}
+    scale = {column: moments[column].scale(imputed=column in fill) for column in SCALED_COLUMNS}
+    # qcut runs on scaled values; scaling is monotone, so scale the edges
+    bins = {column: (raw_bins[column] - mean[column]) / scale[column] for column in QUANTILE_COLUMNS}
+    return {'fill': fill, 'min_date': plan['min_date'], 'mean': mean, 'scale': scale, 'bins': bins}
+
+
+def split_partitions(df, partitions, directory):
+    bounds = np.linspace(0, len(df), partitions + 1).astype(int)
+    paths = []
+    for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        path = os.path.join(directory, f'part-{i:04d}.arrow')
+        save_snapshot(df.iloc[start:end].reset_index(drop=True), path)
+        paths.append(path)
+    return paths
+
+
+def run_partitioned(df, partitions=8, workers=None):
+    """handle_null_values, preprocess_data and create_features over partitions.
+
+    Returns the transformed frame and the FittedTransforms it applied.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    directory = tempfile.mkdtemp(prefix='partitions-', dir=SNAPSHOT_DIR)
+    try:
+        paths = split_partitions(df, partitions, directory)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            params = fit_params(paths, pool)
+            outputs = [path.replace('part-', 'out-') for path in paths]
+            done = list(pool.map(_apply_pass, paths, [params] * len(paths), outputs))
+        result = pd.concat([load_snapshot(path) for path in done], ignore_index=True)
+        return result, FittedTransforms.from_params(params)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def compare_frames(expected, actual, rtol=1e-6, atol=1e-6):
+    """Per-column differences; numeric columns must agree within rtol/atol."""
+    report = {}
+    for column in expected.columns:
+        left, right = expected[column], actual[column]
+        if pd.api.types.is_numeric_dtype(left) and not isinstance(left.dtype, pd.CategoricalDtype):
+            left = left.to_numpy(dtype=np.float64)
+            right = right.to_numpy(dtype=np.float64)
+            report[column] = {
+                'max_abs_diff': float(np.nanmax(np.abs(left - right))) if len(left) else 0.0,
+                'match': bool(np.allclose(left, right, rtol=rtol, atol=atol, equal_nan=True)),
+            }
+        else:
+            mismatches = int(_differs(left, right).sum())
+            report[column] = {'mismatches': mismatches, 'match': mismatches == 0}
+    return report
+
+
+def _differs(left, right):
+    """Per-row inequality; missing on both sides (NaN, None, <NA>) counts as equal."""
+    if isinstance(left.dtype, pd.CategoricalDtype) and isinstance(right.dtype, pd.CategoricalDtype):
+        # Compare by code once the categories line up; code -1 is missing
+        if list(left.cat.categories) == list(right.cat.categories):
+            return left.cat.codes.to_numpy() != right.cat.codes.to_numpy()
+        left, right = left.astype(object), right.astype(object)
+    left_missing = left.isna().to_numpy()
+    right_missing = right.isna().to_numpy()
+    unequal = left.astype(object).to_numpy() != right.astype(object).to_numpy()
+    return np.where(left_missing | right_missing, left_missing != right_missing, unequal)
@@ -1,20 +1,38 @@
-from fastapi import FastAPI, Path, HTTPException
+from fastapi import FastAPI, Path, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import threading
 from datetime import datetime
-import random
+from decouple import config
+
+from dataset_store import DatasetNotReady, DatasetStore
+from perf_index import PerformanceIndex
+from ragged import RaggedColumn
+from response_cache import ResponseCache
+from schema import build_frame, memory_report
+from scoring import STATUS_SCHEMES
+from streaming import MEDIA_TYPES, encode_frame
 
 app = FastAPI()
 
+# Cache the read endpoints; POST /dataset/preprocess invalidates them.
+# /dataset/sample streams, so it is left out (the cache buffers whole bodies).
+response_cache = ResponseCache.from_env(
+    paths=["/dataset/description", "/students/performance"]
+)
+response_cache.install(app)
+
 
-# Generate synthetic data for 500,000 students
-def generate_sample_data():
-    np.random.seed(42)
-    num_records = 500000
+# Generate synthetic data for 500,000 students, one whole column at a time
+def generate_sample_data(num_records=500000, seed=42):
+    rng = np.random.default_rng(seed)
 
-    subjects = [
+    subjects = np.array([
         "Math",
         "Physics",
         "Chemistry",
@@ -22,59 +40,92 @@ def generate_sample_data():
         "History",
         "English",
         "Computer Science",
-    ]
-    grades = ["A", "B", "C", "D", "F"]
+    ])
+    grades = np.array(["A", "B", "C", "D", "F"])
+
+    student_ids = np.arange(1, num_records + 1)
+    enrollment_offsets = rng.integers(0, 1000, num_records).astype("timedelta64[D]")
+    subject_counts = rng.integers(3, 7, num_records)
+    grade_counts = rng.integers(3, 7, num_records)
 
     data = {
-        "student_id": range(1, num_records + 1),
-        "name": [f"Student_{i}" for i in range(1, num_records + 1)],
-        "age": np.random.randint(15, 22, num_records),
-        "grade_level": np.random.randint(9, 13, num_records),
-        "enrollment_date": [
-            datetime.now().date() - pd.Timedelta(days=np.random.randint(0, 1000))
-            for _ in range(num_records)
-        ],
-        "gpa": np.random.uniform(2.0, 4.0, num_records),
-        "attendance_rate": np.random.uniform(0.7, 1.0, num_records),
-        "subjects": [
-            [random.choice(subjects) for _ in range(random.randint(3, 6))]
-            for _ in range(num_records)
-        ],
-        "grades": [
-            [random.choice(grades) for _ in range(random.randint(3, 6))]
-            for _ in range(num_records)
-        ],
+        "student_id": student_ids,
+        "name": pd.arrays.ArrowExtensionArray(pc.binary_join_element_wise(
+            "Student_", pa.array(student_ids).cast(pa.string()), ""
+        )),
+        "age": rng.integers(15, 22, num_records),
+        "grade_level": rng.integers(9, 13, num_records),
+        "enrollment_date": np.datetime64(datetime.now().date(), "D") - enrollment_offsets,
+        "gpa": rng.uniform(2.0, 4.0, num_records),
+        "attendance_rate": rng.uniform(0.7, 1.0, num_records),
+        "subjects": RaggedColumn.from_lengths(
+            subject_counts, subjects[rng.integers(0, len(subjects), subject_counts.sum())]
+        ),
+        "grades": RaggedColumn.from_lengths(
+            grade_counts, grades[rng.integers(0, len(grades), grade_counts.sum())]
+        ),
     }
 
     # Introduce some null values
-    data["gpa"] = [None if random.random() < 0.05 else x for x in data["gpa"]]
-    data["attendance_rate"] = [
-        None if random.random() < 0.05 else x for x in data["attendance_rate"]
-    ]
+    data["gpa"][rng.random(num_records) < 0.05] = np.nan
+    data["attendance_rate"][rng.random(num_records) < 0.05] = np.nan
+
+    return build_frame(data)
+
+
+# Loaded in the background on startup; later starts reuse the on-disk snapshot
+store = DatasetStore(
+    generate_sample_data,
+    snapshot_path=config("DATASET_SNAPSHOT", default="student_dataset.arrow"),
+)
+
 
-    return pd.DataFrame(data)
+@app.on_event("startup")
+def load_dataset():
+    store.start_loading()
 
 
-# Initialize the dataset
-df = generate_sample_data()
+def current_dataset():
+    try:
+        return store.get()
+    except DatasetNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
 
 # Data preprocessing functions
-def preprocess_data():
-    global df
-    # Handle null values
-    df["gpa"].fillna(df["gpa"].mean(), inplace=True)
-    df["attendance_rate"].fillna(df["attendance_rate"].median(), inplace=True)
-
-    # Create new features
-    df["academic_status"] = df["gpa"].apply(
-        lambda x: "Good" if x >= 3.0 else "Needs Improvement"
-    )
-    df["attendance_status"] = df["attendance_rate"].apply(
-        lambda x: "Regular" if x >= 0.8 else "Irregular"
+ACADEMIC_STATUS = STATUS_SCHEMES["dataset-v1"]
+ATTENDANCE_STATUS = STATUS_SCHEMES["attendance-v1"]
+
+# Serializes POST /dataset/preprocess; readers never wait on it
+preprocess_lock = threading.Lock()
+preprocessed_version = None
+
+
+def preprocess_frame(df):
+    """Return a new frame with nulls filled and the status columns derived."""
+    gpa = df["gpa"].fillna(df["gpa"].mean())
+    attendance_rate = df["attendance_rate"].fillna(df["attendance_rate"].median())
+    return df.assign(
+        gpa=gpa,
+        attendance_rate=attendance_rate,
+        academic_status=ACADEMIC_STATUS(gpa),
+        attendance_status=ATTENDANCE_STATUS(attendance_rate),
     )
 
-    return {"message": "Data preprocessing completed successfully"}
+
+def preprocess_data():
+    global preprocessed_version
+    with preprocess_lock:
+        df, version = store.snapshot()
+        if version == preprocessed_version:
+            return {"message": "Dataset already preprocessed", "version": version, "changed": False}
+
+        # The published frame is never mutated; preprocessing builds the next version
+        new_version = store.publish(preprocess_frame(df), expected_version=version)
+        if new_version is None:
+            raise HTTPException(status_code=409, detail="Dataset changed during preprocessing, retry")
+        preprocessed_version = new_version
+    return {"message": "Data preprocessing completed successfully", "version": new_version, "changed": True}
 
 
 # New Pydantic models
@@ -93,37 +144,77 @@ class Student(BaseModel):
 
 
 # New endpoints
-@app.get("/dataset/description")
-def get_dataset_description():
+@app.get("/ready")
+def readiness():
+    status = store.status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+
+def describe_dataset(df):
+    # Numeric columns only: datetime columns would add Timestamp/NaT values,
+    # and NaN (e.g. std of one row) isn't valid JSON
+    summary = df.describe(include=[np.number])
+    summary = summary.astype(object).where(summary.notna(), None)
     return {
         "total_records": len(df),
         "columns": list(df.columns),
-        "summary_statistics": df.describe().to_dict(),
-        "null_values": df.isnull().sum().to_dict(),
+        "summary_statistics": summary.to_dict(),
+        "null_values": {column: int(count) for column, count in df.isnull().sum().items()},
     }
 
 
+@app.get("/dataset/description")
+def get_dataset_description():
+    current_dataset()
+    # Computed once per dataset version
+    return store.derived("description", describe_dataset)
+
+
 @app.get("/dataset/sample")
-def get_dataset_sample(n: int = 10):
-    return df.head(n).to_dict(orient="records")
+def get_dataset_sample(
+    n: int = Query(10, ge=0),
+    format: Literal["json", "ndjson", "csv", "arrow"] = "json",
+):
+    df = current_dataset()
+    return StreamingResponse(encode_frame(df.iloc[:n], format), media_type=MEDIA_TYPES[format])
 
 
 @app.post("/dataset/preprocess")
 def perform_preprocessing():
-    return preprocess_data()
+    result = preprocess_data()
+    if result["changed"]:
+        response_cache.invalidate()
+    return result
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/dataset/memory")
+def get_dataset_memory():
+    df = current_dataset()
+    return memory_report(df)["before_mb"].to_dict()
 
 
 @app.get("/students/performance")
-def get_student_performance(min_gpa: Optional[float] = None):
-    if min_gpa:
-        filtered_df = df[df["gpa"] >= min_gpa]
-        return {
-            "total_students": len(filtered_df),
-            "average_gpa": filtered_df["gpa"].mean(),
-            "average_attendance": filtered_df["attendance_rate"].mean(),
-        }
-    return {
-        "total_students": len(df),
-        "average_gpa": df["gpa"].mean(),
-        "average_attendance": df["attendance_rate"].mean(),
-    }
+def get_student_performance(
+    min_gpa: Optional[float] = None,
+    max_gpa: Optional[float] = None,
+    grade_level: Optional[int] = None,
+    min_attendance: Optional[float] = None,
+    max_attendance: Optional[float] = None,
+):
+    current_dataset()
+    # Built once per dataset version, so it follows /dataset/preprocess
+    index = store.derived("performance_index", PerformanceIndex)
+    return index.query(
+        min_gpa=min_gpa,
+        max_gpa=max_gpa,
+        grade_level=grade_level,
+        min_attendance=min_attendance,
+        max_attendance=max_attendance,
+    )
@@ -0,0 +1,122 @@
+"""Range-aggregate index behind /students/performance.
+
+Rows are sorted by GPA once, with prefix sums of GPA and attendance, so a
+GPA range maps to two binary searches and the count and means come from
+prefix-sum differences, in O(log n) and without copying the frame. There is
+one such partition for the whole dataset and one per grade level, plus an
+attendance-sorted mirror for attendance-only filters. A query that filters
+GPA and attendance together scans only the GPA-selected slice.
+"""
+import numpy as np
+
+
+def _prefix(values):
+    out = np.zeros(len(values) + 1, dtype=np.float64)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def _mean(total, count):
+    return float(total / count) if count else None
+
+
+class _SortedAggregates:
+    """Rows sorted on ``key`` (NaN keys dropped) with prefix sums of ``other``."""
+
+    def __init__(self, key, other):
+        valid = ~np.isnan(key)
+        order = np.argsort(key[valid], kind="stable")
+        self.key = key[valid][order]
+        self.other = other[valid][order]
+        other_valid = ~np.isnan(self.other)
+        self.key_sum = _prefix(self.key)
+        self.other_sum = _prefix(np.where(other_valid, self.other, 0.0))
+        self.other_count = _prefix(other_valid)
+
+    def bounds(self, low, high):
+        lo = 0 if low is None else int(np.searchsorted(self.key, low, side="left"))
+        hi = len(self.key) if high is None else int(np.searchsorted(self.key, high, side="right"))
+        return lo, max(lo, hi)
+
+    def aggregate(self, low, high):
+        """(count, key sum, key count, other sum, other count) for low <= key <= high."""
+        lo, hi = self.bounds(low, high)
+        count = hi - lo
+        return (
+            count,
+            self.key_sum[hi] - self.key_sum[lo],
+            count,
+            self.other_sum[hi] - self.other_sum[lo],
+            self.other_count[hi] - self.other_count[lo],
+        )
+
+
+class _Partition:
+    def __init__(self, gpa, attendance):
+        self.size = len(gpa)
+        self.gpa_sum = float(np.nansum(gpa))
+        self.gpa_count = int(np.count_nonzero(~np.isnan(gpa)))
+        self.attendance_sum = float(np.nansum(attendance))
+        self.attendance_count = int(np.count_nonzero(~np.isnan(attendance)))
+        self.by_gpa = _SortedAggregates(gpa, attendance)
+        self.by_attendance = _SortedAggregates(attendance, gpa)
+
+    def query(self, min_gpa, max_gpa, min_attendance, max_attendance):
+        gpa_filter = min_gpa is not None or max_gpa is not None
+        attendance_filter = min_attendance is not None or max_attendance is not None
+
+        if not gpa_filter and not attendance_filter:
+            return (self.size, self.gpa_sum, self.gpa_count,
+                    self.attendance_sum, self.attendance_count)
+
+        if not attendance_filter:
+            return self.by_gpa.aggregate(min_gpa, max_gpa)
+
+        if not gpa_filter:
+            count, att_sum, att_count, gpa_sum, gpa_count = \
+                self.by_attendance.aggregate(min_attendance, max_attendance)
+            return count, gpa_sum, gpa_count, att_sum, att_count
+
+        # Both ranges: filter attendance within the GPA slice (views, no copy)
+        lo, hi = self.by_gpa.bounds(min_gpa, max_gpa)
+        gpa = self.by_gpa.key[lo:hi]
+        attendance = self.by_gpa.other[lo:hi]
+        mask = ~np.isnan(attendance)
+        if min_attendance is not None:
+            mask &= attendance >= min_attendance
+        if max_attendance is not None:
+            mask &= attendance <= max_attendance
+        count = int(np.count_nonzero(mask))
+        return (count, float(gpa[mask].sum()), count,
+                float(attendance[mask].sum()), count)
+
+
+class PerformanceIndex:
+    def __init__(self, df):
+        gpa = df["gpa"].to_numpy(dtype=np.float64, na_value=np.nan)
+        attendance = df["attendance_rate"].to_numpy(dtype=np.float64, na_value=np.nan)
+        grade_levels = df["grade_level"].to_numpy()
+
+        self.all = _Partition(gpa, attendance)
+        self.by_grade_level = {
+            int(level): _Partition(gpa[grade_levels == level], attendance[grade_levels == level])
+            for level in np.unique(grade_levels)
+        }
+
+    def query(self, min_gpa=None, max_gpa=None, grade_level=None,
+              min_attendance=None, max_attendance=None):
+        if grade_level is None:
+            partition = self.all
+        else:
+            partition = self.by_grade_level.get(grade_level)
+            if partition is None:
+                return {"total_students": 0, "average_gpa": None, "average_attendance": None}
+
+        count, gpa_sum, gpa_count, att_sum, att_count = partition.query(
+            min_gpa, max_gpa, min_attendance, max_attendance
+        )
+        return {
+            "total_students": int(count),
+            "average_gpa": _mean(gpa_sum, gpa_count),
+            "average_attendance": _mean(att_sum, att_count),
+        }
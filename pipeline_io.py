@@ -0,0 +1,272 @@
+"""Columnar output and cached stage snapshots for the analysis pipelines.
+
+- write_parquet / ParquetChunkWriter write compressed Parquet with
+  categorical and datetime columns typed, instead of untyped CSV.
+- run_stage runs a pipeline stage once per distinct input. The snapshot key
+  hashes the input frame's contents, the stage's source code, the source of
+  every module of this repository it depends on (scoring.py, schema.py,
+  ...) and its arguments. A rerun with unchanged inputs memory-maps the
+  stored Arrow IPC snapshot instead of recomputing. Snapshots past
+  PIPELINE_CACHE_MAX_AGE_DAYS, or beyond PIPELINE_CACHE_MAX_BYTES in total,
+  are pruned least recently used first.
+"""
+import hashlib
+import inspect
+import os
+import sys
+import time
+import types
+
+from decouple import config
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from ragged import RaggedColumn
+from schema import apply_schema
+
+
+SNAPSHOT_DIR = '.pipeline_cache'
+
+# Bounds for the snapshot directory; least recently used snapshots go first
+SNAPSHOT_MAX_BYTES = config('PIPELINE_CACHE_MAX_BYTES', default=4 * 1024**3, cast=int)
+SNAPSHOT_MAX_AGE_DAYS = config('PIPELINE_CACHE_MAX_AGE_DAYS', default=14.0, cast=float)
+
+# Modules under this directory count as stage code; installed packages don't
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Object columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def _list_digest(series):
+    """Hash parts of a list-valued column: offsets, validity and flat values.
+
+    Works on the Arrow buffers (or a RaggedColumn for object lists), so no
+    per-row Python objects or strings are built.
+    """
+    if isinstance(series.dtype, pd.ArrowDtype):
+        array = pa.array(series)
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        offsets = np.asarray(array.offsets, dtype=np.int64)
+        offsets = offsets - offsets[0]
+        values = array.flatten()
+    else:
+        ragged = RaggedColumn.from_lists(series)
+        offsets = ragged.offsets
+        values = ragged.values
+    parts = [offsets.tobytes(), series.isna().to_numpy().tobytes()]
+    try:
+        # Few distinct items (subjects, grades): hash the dictionary once
+        # and the per-item codes as raw bytes
+        encoded = pc.dictionary_encode(pa.array(values, from_pandas=True))
+        parts.append(encoded.indices.fill_null(-1).to_numpy().tobytes())
+        dictionary = pd.Series(encoded.dictionary.to_numpy(zero_copy_only=False), dtype=object)
+        parts.append(pd.util.hash_pandas_object(dictionary, index=False).values.tobytes())
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Items of mixed types
+        values = pd.Series(np.asarray(values, dtype=object), dtype=object)
+        parts.append(pd.util.hash_pandas_object(values, index=False).values.tobytes())
+    return parts
+
+
+def _is_list_column(series):
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return pa.types.is_list(series.dtype.pyarrow_dtype) or pa.types.is_large_list(series.dtype.pyarrow_dtype)
+    if series.dtype != object:
+        return False
+    sample = series.dropna()
+    return not sample.empty and isinstance(sample.iloc[0], (list, tuple, np.ndarray))
+
+
+def frame_hash(df):
+    """Content hash of a DataFrame: columns, dtypes, index and values."""
+    digest = hashlib.sha256()
+    digest.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df.index).values.tobytes())
+    for column in df.columns:
+        series = df[column]
+        if _is_list_column(series):
+            for part in _list_digest(series):
+                digest.update(part)
+        else:
+            digest.update(pd.util.hash_pandas_object(series, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def _repo_module(value):
+    if isinstance(value, types.ModuleType):
+        module = value
+    else:
+        module = sys.modules.get(getattr(value, '__module__', None) or '')
+    path = getattr(module, '__file__', None)
+    if path and os.path.abspath(path).startswith(REPO_DIR + os.sep):
+        return module
+    return None
+
+
+def code_dependencies(func):
+    """The repository modules ``func`` reaches through imports, its own included."""
+    found = {}
+    pending = [sys.modules[func.__module__]]
+    while pending:
+        module = pending.pop()
+        if module.__name__ in found:
+            continue
+        found[module.__name__] = module
+        for value in vars(module).values():
+            dependency = _repo_module(value)
+            if dependency is not None and dependency.__name__ not in found:
+                pending.append(dependency)
+    return [found[name] for name in sorted(found)]
+
+
+def stage_key(name, func, df, args, kwargs, extra=None):
+    digest = hashlib.sha256(name.encode())
+    digest.update(repr(extra).encode())
+    digest.update(inspect.getsource(func).encode())
+    # Helpers change results too, so any edit to a dependency invalidates
+    for module in code_dependencies(func):
+        digest.update(module.__name__.encode())
+        digest.update(inspect.getsource(module).encode())
+    digest.update(repr((args, sorted(kwargs.items()))).encode())
+    if df is not None:
+        digest.update(frame_hash(df).encode())
+    return digest.hexdigest()[:20]
+
+
+def save_snapshot(df, path):
+    # Uncompressed so the file can be memory-mapped without decoding
+    tmp_path = path + '.tmp'
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def _arrow_backed(pa_type):
+    # Keep strings and lists in Arrow memory instead of Python objects
+    if pa.types.is_string(pa_type) or pa.types.is_large_string(pa_type) or pa.types.is_list(pa_type):
+        return pd.ArrowDtype(pa_type)
+    return None
+
+
+def load_snapshot(path):
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas(types_mapper=_arrow_backed)
+
+
+def prune_snapshots(snapshot_dir=SNAPSHOT_DIR, max_bytes=SNAPSHOT_MAX_BYTES,
+                    max_age_days=SNAPSHOT_MAX_AGE_DAYS, keep=None):
+    """Delete stage snapshots older than ``max_age_days``, then the least
+    recently used ones until the rest fit in ``max_bytes``. Returns the
+    removed paths."""
+    snapshots = []
+    for entry in os.scandir(snapshot_dir):
+        if entry.is_file() and entry.name.endswith('.arrow'):
+            stat = entry.stat()
+            snapshots.append((stat.st_mtime, stat.st_size, entry.path))
+    snapshots.sort()
+
+    cutoff = time.time() - max_age_days * 86400
+    total = sum(size for _, size, _ in snapshots)
+    removed = []
+    for mtime, size, path in snapshots:
+        if path == keep or (mtime >= cutoff and total <= max_bytes):
+            continue
+        os.remove(path)
+        total -= size
+        removed.append(path)
+    return removed
+
+
+def run_stage(name, func, df, *args, snapshot_dir=SNAPSHOT_DIR, key_extra=None, **kwargs):
+    """Run ``func(df, *args, **kwargs)``, or reuse its snapshot for the same inputs.
+
+    Pass ``df=None`` for source stages that take no frame (e.g. generators);
+    they are keyed on their code and arguments only. ``key_extra`` adds
+    inputs the function reads implicitly, such as today's date.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    key = stage_key(name, func, df, args, kwargs, key_extra)
+    path = os.path.join(snapshot_dir, f"{name}-{key}.arrow")
+
+    if os.path.exists(path):
+        print(f"[{name}] inputs unchanged, loading snapshot {path}")
+        # Mark as recently used for prune_snapshots
+        os.utime(path)
+        return load_snapshot(path)
+
+    started = time.perf_counter()
+    # Stages mutate their input; memory-mapped snapshot columns are read-only
+    result = func(*args, **kwargs) if df is None else func(df.copy(), *args, **kwargs)
+    save_snapshot(to_columnar(result), path)
+    print(f"[{name}] computed in {time.perf_counter() - started:.1f}s, snapshot saved")
+    prune_snapshots(snapshot_dir, keep=path)
+    # Hand back the snapshot itself so cold and warm runs see identical dtypes
+    return load_snapshot(path)
+
+
+def to_columnar(df):
+    """Give a frame Arrow-friendly types: categoricals, datetimes, plain lists."""
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if series.dtype != object:
+            continue
+        sample = series.dropna()
+        if sample.empty:
+            continue
+        first = sample.iloc[0]
+        if hasattr(first, 'year') and hasattr(first, 'month'):
+            df[column] = pd.to_datetime(series)
+        elif isinstance(first, str) and series.nunique() <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+            df[column] = series.astype('category')
+    return df
+
+
+def write_parquet(df, path, compression='zstd'):
+    df = to_columnar(df)
+    df.to_parquet(path, engine='pyarrow', compression=compression, index=False)
+    return path
+
+
+def read_parquet(path):
+    # Same dtypes as a snapshot or a fresh load: Arrow-backed strings and
+    # lists, then the student schema
+    df = pq.read_table(path, memory_map=True).to_pandas(types_mapper=_arrow_backed)
+    return apply_schema(df)
+
+
+class ParquetChunkWriter:
+    """Append DataFrame chunks to one Parquet file (one row group per chunk).
+
+    The first chunk fixes the schema; later chunks are cast to it.
+    """
+
+    def __init__(self, path, compression='zstd'):
+        self.path = path
+        self.compression = compression
+        self._writer = None
+        self.rows = 0
+
+    def write(self, df):
+        table = pa.Table.from_pandas(to_columnar(df), preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema, compression=self.compression)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,158 @@
+"""Figures for the analysis pipelines, aggregated first and drawn in parallel.
+
+Histogram counts, box-plot statistics and scatter samples are computed with
+NumPy in the calling process, so a figure spec holds a few hundred numbers
+instead of 500k rows. render_figures then draws the specs on a process pool
+with the Agg backend. A figure is skipped when its spec hashes the same as
+the last render, since the spec fully determines the image.
+"""
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+HASH_MANIFEST = '.figure_hashes.json'
+
+
+def _finite(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[np.isfinite(values)]
+
+
+def histogram(name, values, title, xlabel, bins=50):
+    counts, edges = np.histogram(_finite(values), bins=bins)
+    return {'name': name, 'kind': 'hist', 'title': title, 'xlabel': xlabel,
+            'ylabel': 'Count', 'counts': counts, 'edges': edges}
+
+
+def _box_stats(values, label):
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    # Whiskers end at the furthest points within 1.5 IQR, as in matplotlib
+    whislo = values[values >= q1 - 1.5 * iqr].min()
+    whishi = values[values <= q3 + 1.5 * iqr].max()
+    # Points past the whiskers are drawn individually, as seaborn did
+    fliers = values[(values < whislo) | (values > whishi)]
+    return {'label': str(label), 'q1': q1, 'med': median, 'q3': q3,
+            'whislo': whislo, 'whishi': whishi, 'fliers': fliers}
+
+
+def box_plot(name, values, groups, title, xlabel, ylabel, figsize=(10, 6)):
+    """Box statistics of ``values`` per group, in category (or sorted) order."""
+    values = np.asarray(values, dtype=np.float64)
+    groups = pd.Series(groups).reset_index(drop=True)
+    if isinstance(groups.dtype, pd.CategoricalDtype):
+        labels = list(groups.cat.categories)
+    else:
+        labels = sorted(groups.dropna().unique())
+    stats = []
+    for label in labels:
+        selected = values[(groups == label).to_numpy() & np.isfinite(values)]
+        if len(selected):
+            stats.append(_box_stats(selected, label))
+    return {'name': name, 'kind': 'box', 'title': title, 'xlabel': xlabel,
+            'ylabel': ylabel, 'stats': stats, 'figsize': figsize}
+
+
+def scatter(name, x, y, title, xlabel, ylabel, sample=1000, seed=42):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(x), size=min(sample, len(x)), replace=False)
+    return {'name': name, 'kind': 'scatter', 'title': title, 'xlabel': xlabel,
+            'ylabel': ylabel, 'x': x[picked], 'y': y[picked]}
+
+
+def _use_agg():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_figure(spec, path):
+    """Draw one spec to ``path``; returns the seconds spent."""
+    started = time.perf_counter()
+    _use_agg()
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=spec.get('figsize', (10, 6)))
+    if spec['kind'] == 'hist':
+        edges = spec['edges']
+        ax.hist(edges[:-1], bins=edges, weights=spec['counts'], edgecolor='white')
+    elif spec['kind'] == 'box':
+        ax.bxp(spec['stats'])
+    elif spec['kind'] == 'scatter':
+        ax.scatter(spec['x'], spec['y'], s=10, alpha=0.6)
+    else:
+        raise ValueError(f"Unknown figure kind: {spec['kind']}")
+    ax.set_title(spec['title'])
+    ax.set_xlabel(spec['xlabel'])
+    ax.set_ylabel(spec['ylabel'])
+    fig.savefig(path)
+    plt.close(fig)
+    return time.perf_counter() - started
+
+
+def spec_hash(spec):
+    digest = hashlib.sha256(inspect.getsource(render_figure).encode())
+    digest.update(pickle.dumps(spec, protocol=4))
+    return digest.hexdigest()
+
+
+def _load_manifest(directory):
+    try:
+        with open(os.path.join(directory, HASH_MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(directory, manifest):
+    path = os.path.join(directory, HASH_MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def render_figures(specs, directory, workers=None):
+    """Render the changed specs into ``directory`` and print per-figure timings.
+
+    Returns {figure name: seconds}, with None for figures that were skipped.
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = _load_manifest(directory)
+    timings = {}
+    pending = []
+    for spec in specs:
+        path = os.path.join(directory, spec['name'] + '.png')
+        digest = spec_hash(spec)
+        if manifest.get(spec['name']) == digest and os.path.exists(path):
+            print(f"[plot] {spec['name']}: unchanged, skipped")
+            timings[spec['name']] = None
+        else:
+            pending.append((spec, path, digest))
+
+    started = time.perf_counter()
+    if len(pending) == 1 or workers == 1:
+        results = [render_figure(spec, path) for spec, path, _ in pending]
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_use_agg) as pool:
+            futures = [pool.submit(render_figure, spec, path) for spec, path, _ in pending]
+            results = [future.result() for future in futures]
+    else:
+        results = []
+
+    for (spec, path, digest), seconds in zip(pending, results):
+        print(f"[plot] {spec['name']}: {seconds:.2f}s")
+        timings[spec['name']] = seconds
+        manifest[spec['name']] = digest
+    if pending:
+        _save_manifest(directory, manifest)
+        print(f"[plot] rendered {len(pending)} figure(s) in {time.perf_counter() - started:.2f}s")
+    return timings
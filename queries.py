@@ -0,0 +1,122 @@
+"""SQL builders for the student endpoints.
+
+All queries use psycopg2 paramstyle (``%s``); database.Database rewrites
+them for asyncpg when needed.
+"""
+from search import escape_like
+
+# performance_score and academic_status are stored generated columns (see scoring.py)
+STUDENT_COLUMNS = """
+    s.student_id, s.name, s.age, s.grade_level,
+    s.enrollment_date, s.gpa, s.attendance_rate,
+    s.performance_score, s.academic_status
+"""
+
+# Subjects and grades for one page of students, fetched in a single batch
+SUBJECTS_FOR_STUDENTS_QUERY = """
+SELECT
+    ss.student_id,
+    array_agg(DISTINCT sub.subject_name) as subjects,
+    array_agg(DISTINCT ss.grade) as grades
+FROM student_subjects ss
+LEFT JOIN subjects sub ON ss.subject_id = sub.subject_id
+WHERE ss.student_id = ANY(%s)
+GROUP BY ss.student_id
+"""
+
+
+def build_student_filters(search=None, min_gpa=None, max_gpa=None, after_id=None):
+    where_clauses = []
+    params = []
+
+    # Served by the trigram index from search.py
+    if search:
+        where_clauses.append("s.name ILIKE %s")
+        params.append(f"%{escape_like(search)}%")
+
+    if min_gpa is not None:
+        where_clauses.append("s.gpa >= %s")
+        params.append(min_gpa)
+
+    if max_gpa is not None:
+        where_clauses.append("s.gpa <= %s")
+        params.append(max_gpa)
+
+    # Keyset mode seeks past the cursor on the primary key instead of
+    # skipping OFFSET rows, so deep pages cost the same as the first one
+    if after_id is not None:
+        where_clauses.append("s.student_id > %s")
+        params.append(after_id)
+
+    where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+    return where_sql, params
+
+
+def build_students_page_query(page=1, limit=10, search=None, min_gpa=None,
+                              max_gpa=None, after_id=None):
+    """Select one page of students from ``students`` alone.
+
+    Filtering, ordering and LIMIT all run before any join, so only the
+    returned ids are looked up in SUBJECTS_FOR_STUDENTS_QUERY.
+    """
+    where_sql, params = build_student_filters(search, min_gpa, max_gpa, after_id)
+    query = f"""
+    SELECT {STUDENT_COLUMNS}
+    FROM students s
+    {where_sql}
+    ORDER BY s.student_id
+    LIMIT %s
+    """
+    params.append(limit)
+
+    if after_id is None:
+        query += " OFFSET %s"
+        params.append((page - 1) * limit)
+
+    return query, params
+
+
+def build_students_export_query(search=None, min_gpa=None, max_gpa=None):
+    """Every student matching the filters, in id order, for streaming export.
+
+    Subjects and grades come from a per-student lateral lookup, so the whole
+    export runs on the one streaming connection.
+    """
+    where_sql, params = build_student_filters(search, min_gpa, max_gpa)
+    query = f"""
+    SELECT {STUDENT_COLUMNS}, subj.subjects, subj.grades
+    FROM students s
+    LEFT JOIN LATERAL (
+        SELECT
+            array_agg(DISTINCT sub.subject_name) as subjects,
+            array_agg(DISTINCT ss.grade) as grades
+        FROM student_subjects ss
+        LEFT JOIN subjects sub ON ss.subject_id = sub.subject_id
+        WHERE ss.student_id = s.student_id
+    ) subj ON true
+    {where_sql}
+    ORDER BY s.student_id
+    """
+    return query, params
+
+
+def build_legacy_students_query(page=1, limit=10, search=None, min_gpa=None,
+                                max_gpa=None):
+    """The original join-aggregate-then-page query, kept for benchmarks."""
+    where_sql, params = build_student_filters(search, min_gpa, max_gpa)
+    query = f"""
+    SELECT
+        {STUDENT_COLUMNS},
+        array_agg(DISTINCT sub.subject_name) as subjects,
+        array_agg(DISTINCT ss.grade) as grades
+    FROM students s
+    LEFT JOIN student_subjects ss ON s.student_id = ss.student_id
+    LEFT JOIN subjects sub ON ss.subject_id = sub.subject_id
+    {where_sql}
+    GROUP BY s.student_id, s.name, s.age, s.grade_level,
+             s.enrollment_date, s.gpa, s.attendance_rate
+    ORDER BY s.student_id
+    LIMIT %s OFFSET %s
+    """
+    params.extend([limit, (page - 1) * limit])
+    return query, params
@@ -0,0 +1,107 @@
+"""Flat storage for list-valued columns such as ``subjects`` and ``grades``.
+
+A RaggedColumn keeps every row's items in one ``values`` array, with
+``offsets`` marking where each row starts (row i is
+``values[offsets[i]:offsets[i + 1]]``). Per-row aggregates then become
+single bincount/groupby calls over ``values`` rather than a Python call per row.
+"""
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+class RaggedColumn:
+    def __init__(self, offsets, values):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.values = np.asarray(values)
+        if len(self.offsets) == 0 or self.offsets[-1] != len(self.values):
+            raise ValueError("offsets must end at len(values)")
+
+    @classmethod
+    def from_lists(cls, lists):
+        """Build from a Series (or sequence) whose items are lists/arrays."""
+        if isinstance(lists, pd.Series) and isinstance(lists.dtype, pd.ArrowDtype):
+            return cls.from_arrow(pa.array(lists.array))
+        items = lists.to_numpy() if isinstance(lists, pd.Series) else list(lists)
+        try:
+            lengths = np.fromiter(map(len, items), dtype=np.int64, count=len(items))
+        except TypeError:
+            # Missing rows (None/NaN) count as empty lists
+            items = [item if isinstance(item, (list, tuple, np.ndarray)) else () for item in items]
+            lengths = np.fromiter(map(len, items), dtype=np.int64, count=len(items))
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.fromiter(chain.from_iterable(items), dtype=object, count=int(offsets[-1]))
+        return cls(offsets, values)
+
+    @classmethod
+    def from_arrow(cls, array):
+        """Build from a pyarrow ListArray (or ChunkedArray of lists) without per-row lists."""
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        offsets = np.asarray(array.offsets, dtype=np.int64)
+        values = array.flatten().to_numpy(zero_copy_only=False)
+        return cls(offsets - offsets[0], values)
+
+    @classmethod
+    def from_lengths(cls, lengths, values):
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(offsets, values)
+
+    @classmethod
+    def from_long(cls, row_positions, values, num_rows):
+        """Build from long format: row_positions[i] is the row owning values[i]."""
+        row_positions = np.asarray(row_positions)
+        order = np.argsort(row_positions, kind='stable')
+        lengths = np.bincount(row_positions, minlength=num_rows)
+        return cls.from_lengths(lengths, np.asarray(values)[order])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def row_positions(self):
+        """Row position of every item in ``values``."""
+        return np.repeat(np.arange(len(self)), self.lengths())
+
+    def map_values(self, mapping):
+        """Map each item through ``mapping``; unknown or missing items become NaN."""
+        keys = list(mapping)
+        codes = pd.Index(keys).get_indexer(self.values)
+        lookup = np.append(np.array([mapping[key] for key in keys], dtype=float), np.nan)
+        # Code -1 (not in mapping) picks the trailing NaN
+        return lookup[codes]
+
+    def count(self, weights=None):
+        """Non-missing items per row (NaN weights count as missing)."""
+        if weights is None:
+            valid = pd.notna(self.values)
+        else:
+            valid = ~np.isnan(weights)
+        return np.bincount(self.row_positions(), weights=valid, minlength=len(self)).astype(np.int64)
+
+    def segment_sum(self, weights):
+        weights = np.asarray(weights, dtype=float)
+        return np.bincount(self.row_positions(), weights=np.nan_to_num(weights), minlength=len(self))
+
+    def segment_mean(self, weights):
+        """Per-row mean of ``weights`` (aligned with ``values``), ignoring NaN."""
+        weights = np.asarray(weights, dtype=float)
+        counts = self.count(weights)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, self.segment_sum(weights) / counts, np.nan)
+
+    def to_long_frame(self, index=None, name='value'):
+        """Exploded (row, value) frame; ``index`` labels rows, e.g. student ids."""
+        positions = self.row_positions()
+        owners = positions if index is None else np.asarray(index)[positions]
+        return pd.DataFrame({'row': owners, name: self.values})
+
+    def to_lists(self):
+        return [self.values[start:end].tolist()
+                for start, end in zip(self.offsets[:-1], self.offsets[1:])]
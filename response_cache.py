@@ -0,0 +1,254 @@
+"""Response cache for the read endpoints of the FastAPI apps.
+
+Responses are keyed on the request path plus its normalized (sorted) query
+parameters and stored with an ETag, so clients sending If-None-Match get a
+304 without a body. Two backends are available:
+
+- InMemoryBackend: LRU with entry-count, byte-size and TTL bounds.
+- RedisBackend: any redis-py compatible client (``fakeredis.FakeRedis()``
+  works for local testing). Its calls block on the network, so the
+  middleware runs them in the threadpool rather than on the event loop.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from decouple import config
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+
+
+class CachedResponse:
+    __slots__ = ("status_code", "body", "media_type", "etag", "stored_at")
+
+    def __init__(self, status_code, body, media_type, etag, stored_at=None):
+        self.status_code = status_code
+        self.body = body
+        self.media_type = media_type
+        self.etag = etag
+        self.stored_at = stored_at if stored_at is not None else time.time()
+
+    def to_json(self):
+        return json.dumps({
+            "status_code": self.status_code,
+            "body": self.body.decode("latin-1"),
+            "media_type": self.media_type,
+            "etag": self.etag,
+            "stored_at": self.stored_at,
+        })
+
+    @classmethod
+    def from_json(cls, payload):
+        data = json.loads(payload)
+        data["body"] = data["body"].encode("latin-1")
+        return cls(**data)
+
+
+class InMemoryBackend:
+    # Lock-protected dict operations; cheap enough to run on the event loop
+    blocking = False
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024, ttl=30.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry.stored_at > self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, prefix=""):
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                self._drop(key)
+        return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "evictions": self.evictions,
+            }
+
+
+def glob_escape(text):
+    """Escape Redis glob metacharacters so ``text`` matches only itself."""
+    return "".join("\\" + char if char in "\\*?[]^" else char for char in text)
+
+
+class RedisBackend:
+    """Stores entries in Redis with a native expiry; Redis handles eviction."""
+
+    blocking = True
+
+    def __init__(self, client, ttl=30.0, namespace="response-cache:"):
+        self.client = client
+        self.ttl = ttl
+        self.namespace = namespace
+
+    @classmethod
+    def from_url(cls, url, ttl=30.0):
+        import redis
+
+        return cls(redis.Redis.from_url(url), ttl=ttl)
+
+    def get(self, key):
+        payload = self.client.get(self.namespace + key)
+        return CachedResponse.from_json(payload) if payload is not None else None
+
+    def set(self, key, entry):
+        self.client.set(self.namespace + key, entry.to_json(), px=int(self.ttl * 1000))
+
+    def invalidate(self, prefix=""):
+        # A literal prefix, as in InMemoryBackend; only the trailing * is a glob
+        pattern = glob_escape(self.namespace + prefix) + "*"
+        keys = list(self.client.scan_iter(match=pattern))
+        if keys:
+            self.client.delete(*keys)
+        return len(keys)
+
+    def stats(self):
+        return {"backend": "redis", "namespace": self.namespace, "ttl_seconds": self.ttl}
+
+
+def etag_for(body):
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResponseCache:
+    """Caches successful GET responses for the configured paths."""
+
+    def __init__(self, backend, paths):
+        self.backend = backend
+        self.paths = set(paths)
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls, paths):
+        ttl = config('RESPONSE_CACHE_TTL', default=30.0, cast=float)
+        if config('RESPONSE_CACHE_BACKEND', default='memory') == 'redis':
+            backend = RedisBackend.from_url(config('REDIS_URL', default='redis://localhost:6379/0'), ttl=ttl)
+        else:
+            backend = InMemoryBackend(
+                max_entries=config('RESPONSE_CACHE_MAX_ENTRIES', default=1024, cast=int),
+                max_bytes=config('RESPONSE_CACHE_MAX_BYTES', default=32 * 1024 * 1024, cast=int),
+                ttl=ttl,
+            )
+        return cls(backend, paths)
+
+    def install(self, app):
+        # Install before CORS so cached entries never carry per-origin headers
+        app.middleware("http")(self.middleware)
+
+    @staticmethod
+    def key_for(request):
+        params = sorted(request.query_params.multi_items())
+        return request.url.path + ("?" + urlencode(params) if params else "")
+
+    def _respond(self, entry, request, cache_status):
+        headers = {"ETag": entry.etag, "X-Cache": cache_status}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=entry.body,
+            status_code=entry.status_code,
+            media_type=entry.media_type,
+            headers=headers,
+        )
+
+    async def _backend_call(self, func, *args):
+        if getattr(self.backend, "blocking", True):
+            return await run_in_threadpool(func, *args)
+        return func(*args)
+
+    async def middleware(self, request: Request, call_next):
+        # RESPONSE_CACHE_TTL=0 turns caching off, e.g. for database benchmarks
+        if request.method != "GET" or request.url.path not in self.paths or self.backend.ttl <= 0:
+            return await call_next(request)
+
+        key = self.key_for(request)
+        entry = await self._backend_call(self.backend.get, key)
+        if entry is not None:
+            self.hits += 1
+            return self._respond(entry, request, "HIT")
+
+        self.misses += 1
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = CachedResponse(
+            status_code=response.status_code,
+            body=body,
+            media_type=response.headers.get("content-type", "application/json"),
+            etag=etag_for(body),
+        )
+        await self._backend_call(self.backend.set, key, entry)
+        return self._respond(entry, request, "MISS")
+
+    def invalidate(self, prefix=""):
+        # Blocking with Redis: call from sync endpoints, which run in the threadpool
+        self.invalidations += 1
+        return self.backend.invalidate(prefix)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            **self.backend.stats(),
+        }
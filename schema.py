@@ -0,0 +1,116 @@
+"""Compact dtypes for the student DataFrames.
+
+Every module that builds a student frame goes through build_frame (at
+construction) or apply_schema (after a load), so the 500k-row datasets use
+int8/int16 integers, categoricals, datetime64 and Arrow-backed strings and
+lists instead of int64, float64 and Python objects.
+
+Run ``python schema.py`` to print the per-column memory of the API dataset
+with default vs compact dtypes.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from ragged import RaggedColumn
+
+
+ARROW_STRING = pd.ArrowDtype(pa.string())
+ARROW_STRING_LIST = pd.ArrowDtype(pa.list_(pa.string()))
+
+# gpa, attendance_rate and average_grade_points stay float64: they are
+# compared against float64 bin edges and thresholds, where float32 rounding
+# moves values across the edges
+STUDENT_SCHEMA = {
+    'student_id': 'int32',
+    'name': ARROW_STRING,
+    'age': 'int8',
+    'grade_level': 'int8',
+    'enrollment_date': 'datetime64[ns]',
+    'gpa': 'float64',
+    'attendance_rate': 'float64',
+    'subjects': ARROW_STRING_LIST,
+    'grades': ARROW_STRING_LIST,
+    'days_enrolled': 'int16',
+    'num_subjects': 'int8',
+    'average_grade_points': 'float64',
+    'academic_status': 'category',
+    'attendance_status': 'category',
+    'attendance_category': 'category',
+    'age_group': 'category',
+}
+
+
+def list_column(ragged):
+    """Arrow-backed list Series straight from a RaggedColumn, no Python lists."""
+    values = pa.array(ragged.values, type=pa.string(), from_pandas=True)
+    if isinstance(values, pa.ChunkedArray):
+        # Large object arrays convert in chunks; ListArray needs one array
+        values = values.combine_chunks()
+    offsets = pa.array(ragged.offsets.astype(np.int32))
+    return pd.Series(pd.arrays.ArrowExtensionArray(pa.ListArray.from_arrays(offsets, values)))
+
+
+def convert_column(values, dtype):
+    if isinstance(values, RaggedColumn):
+        return list_column(values)
+    if dtype == 'datetime64[ns]':
+        return pd.to_datetime(pd.Series(values))
+    if str(dtype).startswith('int') and pd.isna(pd.Series(values)).any():
+        # Nullable integer when the column has gaps
+        return pd.Series(values).astype(str(dtype).capitalize())
+    return pd.Series(values).astype(dtype)
+
+
+def build_frame(data, schema=STUDENT_SCHEMA):
+    """Build a DataFrame from a dict of columns, typing each as it is added."""
+    columns = {}
+    for name, values in data.items():
+        dtype = schema.get(name)
+        if dtype is None:
+            columns[name] = values if isinstance(values, pd.Series) else pd.Series(values)
+        else:
+            columns[name] = convert_column(values, dtype)
+    return pd.DataFrame({name: column.reset_index(drop=True) for name, column in columns.items()})
+
+
+def apply_schema(df, schema=STUDENT_SCHEMA):
+    """Convert the schema's columns of an already-built frame."""
+    for name, dtype in schema.items():
+        if name in df.columns and df[name].dtype != dtype:
+            df[name] = convert_column(df[name], dtype).set_axis(df.index)
+    return df
+
+
+def memory_report(before, after=None):
+    """Per-column deep memory in MB, optionally before vs after."""
+    report = pd.DataFrame({'before_mb': before.memory_usage(deep=True, index=False) / 2**20})
+    if after is not None:
+        report['after_mb'] = after.memory_usage(deep=True, index=False) / 2**20
+        report['saved_pct'] = (1 - report['after_mb'] / report['before_mb']) * 100
+    report.loc['TOTAL'] = report.sum()
+    if after is not None:
+        report.loc['TOTAL', 'saved_pct'] = (
+            1 - report.loc['TOTAL', 'after_mb'] / report.loc['TOTAL', 'before_mb']
+        ) * 100
+    return report.round(2)
+
+
+if __name__ == "__main__":
+    from myendpoints import generate_sample_data
+
+    compact = generate_sample_data()
+    default = compact.copy()
+    for column in default.columns:
+        series = default[column]
+        if isinstance(series.dtype, pd.ArrowDtype) and pa.types.is_list(series.dtype.pyarrow_dtype):
+            default[column] = pd.Series(series.tolist(), dtype=object, index=series.index)
+        elif isinstance(series.dtype, pd.ArrowDtype):
+            default[column] = series.astype(object)
+        elif column == 'enrollment_date':
+            default[column] = series.dt.date
+        elif series.dtype.kind == 'i':
+            default[column] = series.astype('int64')
+        elif series.dtype.kind == 'f':
+            default[column] = series.astype('float64')
+    print(memory_report(default, compact))
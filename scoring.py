@@ -0,0 +1,207 @@
+"""Student scoring shared by the API and the analysis pipelines.
+
+performance_score and the status labels are defined once here, as
+versioned formulas and threshold schemes:
+
+- api-v1: 0.7 * gpa + 0.3 * attendance_rate (main.py).
+- pipeline-v1: 0.4 * gpa + 0.3 * attendance_rate + 0.3 * average_grade_points
+  (dataframes.py).
+- ml-v1: the mean of the standardized gpa and attendance_rate (ml_analysis.py
+  and its fitted transforms).
+
+Formulas and schemes take a scalar, a NumPy array or a Series per column,
+or a whole DataFrame, and return the same kind. They can also render
+themselves as SQL, for the stored students columns. The quantile-based
+statuses of the pipelines depend on the data, so they stay with pd.qcut and
+FittedTransforms.
+"""
+import numpy as np
+import pandas as pd
+
+
+# Academic status labels, lowest first (the same four for thresholds and quartiles)
+ACADEMIC_LABELS = ["Poor", "Fair", "Good", "Excellent"]
+
+
+def _as_float(values):
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if isinstance(values, (np.ndarray, list, tuple)):
+        # None becomes NaN
+        return np.array(values, dtype=np.float64)
+    return np.nan if values is None else float(values)
+
+
+def _like(result, data):
+    """Shape ``result`` like the input: Series for frames, None/float for scalars."""
+    if isinstance(data, pd.DataFrame):
+        return pd.Series(result, index=data.index)
+    if isinstance(data, dict):
+        # A mapping of Series scores to a Series on their index
+        series = [values for values in data.values() if isinstance(values, pd.Series)]
+        if series:
+            return pd.Series(result, index=series[0].index)
+    if isinstance(data, pd.Series):
+        return pd.Series(result, index=data.index, name=data.name)
+    if isinstance(result, np.ndarray):
+        return result
+    return None if result != result else result
+
+
+class ScoreFormula:
+    """``multiplier * sum(weight * column)``; NaN (None for scalars) if any input is missing.
+
+    ``raw_inputs`` is False for formulas meant for transformed (e.g.
+    standardized) columns rather than the values stored per student.
+    """
+
+    def __init__(self, version, weights, multiplier=1.0, raw_inputs=True):
+        self.version = version
+        self.weights = weights
+        self.multiplier = multiplier
+        self.raw_inputs = raw_inputs
+
+    @property
+    def columns(self):
+        return list(self.weights)
+
+    def __call__(self, data):
+        total = None
+        for column, weight in self.weights.items():
+            term = _as_float(data[column])
+            if weight != 1:
+                term = term * weight
+            total = term if total is None else total + term
+        if self.multiplier != 1:
+            total = total * self.multiplier
+        return _like(total, data)
+
+    def sql(self, alias=""):
+        prefix = f"{alias}." if alias else ""
+        terms = " + ".join(
+            f"{prefix}{column}" if weight == 1 else f"{prefix}{column} * {weight}"
+            for column, weight in self.weights.items()
+        )
+        return f"({terms}) * {self.multiplier}" if self.multiplier != 1 else f"({terms})"
+
+
+class StatusScheme:
+    """Labels from ascending thresholds: ``labels[i]`` once ``value >= thresholds[i - 1]``.
+
+    ``column`` names the student column the thresholds apply to.
+    """
+
+    def __init__(self, version, thresholds, labels, missing="Unknown", column="gpa"):
+        if len(labels) != len(thresholds) + 1:
+            raise ValueError("Need exactly one more label than thresholds")
+        self.version = version
+        self.thresholds = thresholds
+        self.labels = labels
+        self.missing = missing
+        self.column = column
+
+    def codes(self, values):
+        """Index into ``labels`` per value, -1 where missing."""
+        values = np.asarray(_as_float(values), dtype=np.float64)
+        codes = np.searchsorted(self.thresholds, values, side="right")
+        return np.where(np.isnan(values), -1, codes)
+
+    def __call__(self, values):
+        if isinstance(values, pd.Series):
+            # Categorical, lowest label first; missing values stay NaN
+            categorical = pd.Categorical.from_codes(self.codes(values), categories=self.labels)
+            return pd.Series(categorical, index=values.index, name=values.name)
+        if isinstance(values, (np.ndarray, list, tuple)):
+            # Code -1 picks the trailing missing label
+            return np.array(self.labels + [self.missing], dtype=object)[self.codes(values)]
+        value = _as_float(values)
+        if value != value:
+            return self.missing
+        return self.labels[int(np.searchsorted(self.thresholds, value, side="right"))]
+
+    def sql(self, column):
+        cases = " ".join(
+            f"WHEN {column} >= {threshold} THEN '{label}'"
+            for threshold, label in reversed(list(zip(self.thresholds, self.labels[1:])))
+        )
+        return f"CASE WHEN {column} IS NULL THEN '{self.missing}' {cases} ELSE '{self.labels[0]}' END"
+
+
+SCORE_FORMULAS = {
+    formula.version: formula for formula in [
+        ScoreFormula("api-v1", {"gpa": 0.7, "attendance_rate": 0.3}),
+        ScoreFormula("pipeline-v1", {"gpa": 0.4, "attendance_rate": 0.3, "average_grade_points": 0.3}),
+        # On standardized inputs; (gpa + attendance_rate) / 2
+        ScoreFormula("ml-v1", {"gpa": 1, "attendance_rate": 1}, multiplier=0.5, raw_inputs=False),
+    ]
+}
+
+STATUS_SCHEMES = {
+    scheme.version: scheme for scheme in [
+        StatusScheme("api-v1", [2.5, 3.0, 3.5], ACADEMIC_LABELS),
+        StatusScheme("dataset-v1", [3.0], ["Needs Improvement", "Good"]),
+        StatusScheme("attendance-v1", [0.8], ["Irregular", "Regular"], column="attendance_rate"),
+    ]
+}
+
+DEFAULT_SCORE_VERSION = "api-v1"
+DEFAULT_STATUS_SCHEME = "api-v1"
+
+# Versions precomputed into the students.performance_score and
+# students.academic_status columns (migration 5)
+STORED_SCORE_VERSION = "api-v1"
+STORED_STATUS_SCHEME = "api-v1"
+
+
+# Columns every student row (and POST /students/score batch) carries
+API_COLUMNS = ["gpa", "attendance_rate"]
+
+
+def check_api_versions(score_version, status_scheme):
+    """Raise ValueError unless the API can score with these versions.
+
+    The formula must be registered and need only the raw API_COLUMNS; the
+    scheme must be registered and label gpa.
+    """
+    formula = SCORE_FORMULAS.get(score_version)
+    if formula is None:
+        raise ValueError(f"Unknown SCORE_VERSION {score_version!r}; expected one of {sorted(SCORE_FORMULAS)}")
+    extra = [column for column in formula.columns if column not in API_COLUMNS]
+    if extra:
+        raise ValueError(f"SCORE_VERSION {score_version!r} needs columns the API lacks: {', '.join(extra)}")
+    if not formula.raw_inputs:
+        raise ValueError(f"SCORE_VERSION {score_version!r} expects transformed inputs, not raw student columns")
+    scheme = STATUS_SCHEMES.get(status_scheme)
+    if scheme is None:
+        raise ValueError(f"Unknown STATUS_SCHEME {status_scheme!r}; expected one of {sorted(STATUS_SCHEMES)}")
+    if scheme.column != "gpa":
+        raise ValueError(f"STATUS_SCHEME {status_scheme!r} labels {scheme.column}, not gpa")
+
+
+def performance_score(data, version=DEFAULT_SCORE_VERSION):
+    """Score a DataFrame, or a mapping of scalars or arrays by column name."""
+    return SCORE_FORMULAS[version](data)
+
+
+def academic_status(gpa, scheme=DEFAULT_STATUS_SCHEME):
+    return STATUS_SCHEMES[scheme](gpa)
+
+
+def score_batch(columns, transforms=None, version=DEFAULT_SCORE_VERSION, scheme=DEFAULT_STATUS_SCHEME):
+    """Score equal-length gpa / attendance_rate arrays.
+
+    With fitted ml_analysis ``transforms`` the status and score follow the
+    fitted pipeline instead of the configured formula and scheme.
+    """
+    if transforms is not None:
+        scored = transforms.transform_arrays(columns)
+        # Code -1 (no bin) picks the trailing "Unknown"
+        labels = np.array(ACADEMIC_LABELS + ["Unknown"], dtype=object)
+        return {
+            "academic_status": labels[scored["academic_status"]],
+            "performance_score": scored["performance_score"],
+        }
+    return {
+        "academic_status": academic_status(columns["gpa"], scheme),
+        "performance_score": performance_score(columns, version),
+    }
@@ -0,0 +1,54 @@
+"""Indexed name search for the Student Data API.
+
+``ILIKE '%term%'`` cannot use a B-tree index, so name search relies on two
+indexes instead:
+
+- a pg_trgm GiST index, which serves substring ILIKE filters and returns
+  ranked matches in similarity order (KNN ``<->``) without sorting them all;
+- a ``lower(name) text_pattern_ops`` B-tree for typeahead prefix lookups.
+
+The indexes are created by migration 0004 in migrations.py
+(NAME_SEARCH_INDEXES).
+"""
+
+
+# Trigrams need at least this many characters to narrow a substring search
+MIN_SUBSTRING_LENGTH = 3
+
+SUBSTRING_SEARCH_QUERY = """
+SELECT student_id, name, similarity(name, %s) AS score
+FROM students
+WHERE name ILIKE %s
+ORDER BY name <-> %s
+LIMIT %s
+"""
+
+PREFIX_SEARCH_QUERY = """
+SELECT student_id, name, similarity(name, %s) AS score
+FROM students
+WHERE lower(name) LIKE %s
+ORDER BY lower(name)
+LIMIT %s
+"""
+
+
+def escape_like(term):
+    """Escape LIKE wildcards so user input only matches literally."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_search_query(term, limit=10, mode="substring"):
+    """Return (query, params) for a ranked substring or prefix name search.
+
+    Substring terms shorter than MIN_SUBSTRING_LENGTH fall back to a prefix
+    search, which is what a typeahead box sends for its first keystrokes.
+    """
+    term = term.strip()
+    if mode == "substring" and len(term) < MIN_SUBSTRING_LENGTH:
+        mode = "prefix"
+
+    if mode == "prefix":
+        return PREFIX_SEARCH_QUERY, [term, escape_like(term.lower()) + "%", limit]
+    if mode == "substring":
+        return SUBSTRING_SEARCH_QUERY, [term, f"%{escape_like(term)}%", term, limit]
+    raise ValueError(f"Unknown search mode: {mode}")
@@ -0,0 +1,103 @@
+"""Incrementally maintained student statistics.
+
+``student_grade_stats`` keeps one row of running sums and counts per grade
+level. Statement-level triggers on ``students`` fold each INSERT, UPDATE,
+DELETE or COPY into it through transition tables, so /students/stats reads a
+handful of rows instead of scanning 500k students.
+
+The table and triggers are created by migration 0003 in migrations.py
+(GRADE_STATS_DDL, frozen there as applied).
+
+Usage:
+    python stats.py rebuild   # recompute from scratch
+"""
+import sys
+
+from decouple import config
+import psycopg2
+
+
+# Full recompute; the SHARE lock blocks writers so no trigger delta is lost
+REBUILD_STATS_SQL = """
+LOCK TABLE students IN SHARE MODE;
+DELETE FROM student_grade_stats;
+INSERT INTO student_grade_stats (grade_level, student_count, gpa_count, gpa_sum,
+                                 attendance_count, attendance_sum, updated_at)
+SELECT grade_level, count(*), count(gpa), coalesce(sum(gpa), 0),
+       count(attendance_rate), coalesce(sum(attendance_rate), 0), now()
+FROM students
+GROUP BY grade_level;
+"""
+
+GRADE_STATS_QUERY = """
+SELECT grade_level, student_count, gpa_count, gpa_sum,
+       attendance_count, attendance_sum, updated_at
+FROM student_grade_stats
+WHERE student_count > 0
+ORDER BY grade_level
+"""
+
+
+def _average(total, count):
+    return float(total) / count if count else None
+
+
+def summarize_grade_stats(rows):
+    """Turn GRADE_STATS_QUERY rows into the /students/stats payload."""
+    total_students = gpa_count = attendance_count = 0
+    gpa_sum = attendance_sum = 0.0
+    updated_at = None
+    by_grade_level = []
+
+    for grade_level, count, g_count, g_sum, a_count, a_sum, row_updated_at in rows:
+        total_students += count
+        gpa_count += g_count
+        gpa_sum += float(g_sum)
+        attendance_count += a_count
+        attendance_sum += float(a_sum)
+        if updated_at is None or row_updated_at > updated_at:
+            updated_at = row_updated_at
+        by_grade_level.append({
+            "grade_level": grade_level,
+            "total_students": count,
+            "average_gpa": _average(g_sum, g_count),
+            "average_attendance": _average(a_sum, a_count),
+        })
+
+    return {
+        "total_students": total_students,
+        "average_gpa": _average(gpa_sum, gpa_count),
+        "average_attendance": _average(attendance_sum, attendance_count),
+        "grade_levels": len(by_grade_level),
+        "by_grade_level": by_grade_level,
+        "updated_at": updated_at.isoformat() if updated_at else None,
+    }
+
+
+def rebuild_stats(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(REBUILD_STATS_SQL)
+    conn.commit()
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] != "rebuild":
+        print(__doc__)
+        sys.exit(1)
+
+    conn = psycopg2.connect(
+        dbname=config('DB_NAME'),
+        user=config('DB_USER'),
+        password=config('DB_PASSWORD'),
+        host=config('DB_HOST', default='localhost'),
+        port=config('DB_PORT', default='5432')
+    )
+    try:
+        rebuild_stats(conn)
+        print("student_grade_stats rebuilt successfully!")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
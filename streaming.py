@@ -0,0 +1,299 @@
+"""Chunked encoders for streaming DataFrames out of the APIs.
+
+Rows are serialized a chunk at a time straight from the column buffers
+(DataFrame.to_json / to_csv / Arrow record batches), never as one Python
+dict per row, so memory stays bounded by the chunk size whatever the row
+count. Each encoder turns a chunk into bytes; ``encode_frame`` drives one
+over a DataFrame or an iterable of chunks, and ``encode_chunks_async`` over
+an async iterable (e.g. a database cursor).
+
+POST /students/score reads its JSON or Arrow payload and encodes its
+response with the helpers at the bottom.
+"""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+CHUNK_ROWS = 10000
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": ARROW_MEDIA_TYPE,
+}
+
+
+def _json_ready(chunk):
+    """Write date-only datetime columns as ISO dates ("2026-07-20"), not timestamps."""
+    dates = {}
+    for column in chunk.columns:
+        series = chunk[column]
+        if not pd.api.types.is_datetime64_dtype(series.dtype):
+            continue
+        present = series.dropna()
+        if (present == present.dt.normalize()).all():
+            dates[column] = series.dt.strftime("%Y-%m-%d")
+    return chunk.assign(**dates) if dates else chunk
+
+
+# to_json defaults to 10 digits; 15 keeps float64 values as sent before streaming
+JSON_DOUBLE_PRECISION = 15
+
+
+class JSONEncoder:
+    """One JSON array, written chunk by chunk."""
+
+    def __init__(self):
+        self._first = True
+
+    def start(self):
+        return b"["
+
+    def encode(self, chunk):
+        if chunk.empty:
+            return b""
+        body = _json_ready(chunk).to_json(
+            orient="records", date_format="iso", double_precision=JSON_DOUBLE_PRECISION
+        )[1:-1]
+        if not self._first:
+            body = "," + body
+        self._first = False
+        return body.encode()
+
+    def finish(self):
+        return b"]"
+
+
+class NDJSONEncoder:
+    def start(self):
+        return b""
+
+    def encode(self, chunk):
+        if chunk.empty:
+            return b""
+        lines = _json_ready(chunk).to_json(
+            orient="records", lines=True, date_format="iso", double_precision=JSON_DOUBLE_PRECISION
+        )
+        return (lines.rstrip("\n") + "\n").encode()
+
+    def finish(self):
+        return b""
+
+
+def _is_sequence(value):
+    return isinstance(value, (list, tuple, np.ndarray))
+
+
+def join_list_columns(chunk, separator=";"):
+    """Flatten list cells into ``separator``-joined strings; other columns are kept."""
+    joined = {}
+    for column in chunk.columns:
+        series = chunk[column]
+        if isinstance(series.dtype, pd.ArrowDtype) and pa.types.is_list(series.dtype.pyarrow_dtype):
+            array = pa.array(series)
+            joined[column] = pd.Series(
+                pc.binary_join(array, separator).to_numpy(zero_copy_only=False),
+                index=series.index,
+            )
+        elif series.dtype == object and series.map(_is_sequence).any():
+            joined[column] = series.map(
+                lambda value: separator.join(map(str, value)) if _is_sequence(value) else value
+            )
+    return chunk.assign(**joined) if joined else chunk
+
+
+class CSVEncoder:
+    """CSV with list cells joined by ``separator``, so every row stays on one line."""
+
+    def __init__(self, separator=";"):
+        self.separator = separator
+        self._header = True
+
+    def start(self):
+        return b""
+
+    def encode(self, chunk):
+        chunk = join_list_columns(chunk, self.separator)
+        body = chunk.to_csv(index=False, header=self._header)
+        self._header = False
+        return body.encode()
+
+    def finish(self):
+        return b""
+
+
+class ArrowEncoder:
+    """Arrow IPC stream; the schema is ``schema`` or that of the first chunk."""
+
+    def __init__(self, schema=None):
+        self.schema = schema
+        self._sink = io.BytesIO()
+        self._writer = None
+
+    def _drain(self):
+        data = self._sink.getvalue()
+        self._sink.seek(0)
+        self._sink.truncate()
+        return data
+
+    def start(self):
+        return b""
+
+    def encode(self, chunk):
+        table = pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+        if self._writer is None:
+            # The first chunk fixes the schema; later ones are cast to it
+            self.schema = table.schema
+            self._writer = pa.ipc.new_stream(self._sink, self.schema)
+        else:
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+        return self._drain()
+
+    def finish(self):
+        if self._writer is None:
+            if self.schema is None:
+                return b""
+            # No rows at all: still send the schema
+            self._writer = pa.ipc.new_stream(self._sink, self.schema)
+        self._writer.close()
+        return self._drain()
+
+
+ENCODERS = {
+    "json": JSONEncoder,
+    "ndjson": NDJSONEncoder,
+    "csv": CSVEncoder,
+    "arrow": ArrowEncoder,
+}
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    if df.empty:
+        # Still yield once so CSV gets its header and Arrow its schema
+        yield df
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def encode_frame(df, fmt, chunk_rows=CHUNK_ROWS, **options):
+    """Encode a DataFrame (or an iterable of chunk DataFrames) in ``fmt``."""
+    chunks = iter_chunks(df, chunk_rows) if isinstance(df, pd.DataFrame) else df
+    encoder = ENCODERS[fmt](**options)
+    yield encoder.start()
+    for chunk in chunks:
+        data = encoder.encode(chunk)
+        if data:
+            yield data
+    yield encoder.finish()
+
+
+async def encode_chunks_async(chunks, fmt, **options):
+    """Like encode_frame, for an async iterable of chunk DataFrames."""
+    encoder = ENCODERS[fmt](**options)
+    yield encoder.start()
+    async for chunk in chunks:
+        data = encoder.encode(chunk)
+        if data:
+            # Each yield waits for the client to take the bytes, so a slow
+            # reader pauses the source instead of growing a buffer
+            yield data
+    yield encoder.finish()
+
+
+SCORE_COLUMNS = ["gpa", "attendance_rate"]
+
+
+class PayloadError(ValueError):
+    """Raised for score requests that can't be read as student columns."""
+
+
+def _float_column(values, name):
+    try:
+        # None becomes NaN
+        column = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise PayloadError(f"'{name}' must contain only numbers or nulls")
+    if column.ndim != 1:
+        raise PayloadError(f"'{name}' must be a flat list")
+    return column
+
+
+def read_payload(body, content_type=""):
+    """Parse a score request body into float64 columns.
+
+    Accepted shapes: an Arrow IPC stream; JSON columns
+    ``{"gpa": [...], "attendance_rate": [...]}``; JSON records
+    ``[{"gpa": ..., "attendance_rate": ...}, ...]`` or ``{"records": [...]}``.
+    """
+    if ARROW_MEDIA_TYPE in (content_type or ""):
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+        except pa.ArrowInvalid as e:
+            raise PayloadError(f"Invalid Arrow stream: {e}")
+        missing = [name for name in SCORE_COLUMNS if name not in table.column_names]
+        if missing:
+            raise PayloadError(f"Missing columns: {', '.join(missing)}")
+        columns = {}
+        for name in SCORE_COLUMNS:
+            try:
+                columns[name] = table.column(name).cast(pa.float64()).to_numpy()
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                raise PayloadError(f"'{name}' must contain only numbers or nulls")
+        return columns
+
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise PayloadError(f"Invalid JSON: {e}")
+
+    if isinstance(payload, dict) and "records" in payload:
+        payload = payload["records"]
+    if isinstance(payload, list):
+        if not all(isinstance(record, dict) for record in payload):
+            raise PayloadError("Records must be JSON objects")
+        return {
+            name: _float_column([record.get(name) for record in payload], name)
+            for name in SCORE_COLUMNS
+        }
+    if isinstance(payload, dict):
+        missing = [name for name in SCORE_COLUMNS if name not in payload]
+        if missing:
+            raise PayloadError(f"Missing columns: {', '.join(missing)}")
+        columns = {name: _float_column(payload[name], name) for name in SCORE_COLUMNS}
+        if len({len(column) for column in columns.values()}) > 1:
+            raise PayloadError("Columns must all have the same length")
+        return columns
+    raise PayloadError("Expected a JSON object or array")
+
+
+def encode_scores_json(scores):
+    # Series.to_json writes the float array in one call, NaN as null
+    return (
+        '{"count":%d,"academic_status":%s,"performance_score":%s}' % (
+            len(scores["performance_score"]),
+            json.dumps(scores["academic_status"].tolist()),
+            pd.Series(scores["performance_score"]).to_json(orient="values", double_precision=15),
+        )
+    ).encode()
+
+
+def encode_scores_arrow(scores):
+    score = scores["performance_score"]
+    table = pa.table({
+        "academic_status": pa.array(scores["academic_status"], type=pa.string()),
+        "performance_score": pa.array(score, mask=np.isnan(score)),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,75 @@
+import os
+
+import pandas as pd
+
+from dataset_store import DatasetStore
+from schema import build_frame
+
+
+def build_students():
+    return build_frame({
+        "student_id": [1, 2, 3],
+        "gpa": [3.5, None, 2.0],
+        "attendance_rate": [0.9, 0.7, None],
+        "subjects": pd.Series([["Math"], [], ["Art", "History"]]),
+    })
+
+
+def load(store):
+    store.start_loading()
+    assert store.wait(timeout=10)
+    return store.get()
+
+
+def test_snapshot_is_written_then_reloaded(tmp_path):
+    path = str(tmp_path / "students.arrow")
+    first = DatasetStore(build_students, snapshot_path=path)
+    generated = load(first)
+    assert first.status()["source"] == "generated"
+    assert os.path.exists(first.snapshot_path)
+
+    second = DatasetStore(build_students, snapshot_path=path)
+    reloaded = load(second)
+    assert second.status()["source"] == "snapshot"
+    pd.testing.assert_frame_equal(reloaded, generated)
+
+
+def test_snapshot_is_keyed_on_the_builder_version(tmp_path):
+    path = str(tmp_path / "students.arrow")
+    (tmp_path / "students.arrow").write_bytes(b"stale unkeyed snapshot")
+    old = DatasetStore(build_students, snapshot_path=path, key_extra="v1")
+    load(old)
+
+    new = DatasetStore(build_students, snapshot_path=path, key_extra="v2")
+    assert new.snapshot_path != old.snapshot_path
+    load(new)
+    assert new.status()["source"] == "generated"
+    # Older versions are cleaned up once the new snapshot exists
+    assert os.listdir(tmp_path) == [os.path.basename(new.snapshot_path)]
+
+
+def test_preprocess_is_idempotent(monkeypatch):
+    import myendpoints
+
+    store = DatasetStore(build_students)
+    original = build_students()
+    store.publish(original)
+    monkeypatch.setattr(myendpoints, "store", store)
+    monkeypatch.setattr(myendpoints, "preprocessed_version", None)
+
+    first = myendpoints.preprocess_data()
+    assert first["changed"] is True
+    processed, version = store.snapshot()
+    assert version == first["version"] == 2
+    assert processed["gpa"].tolist() == [3.5, 2.75, 2.0]
+    assert processed["academic_status"].astype(str).tolist() == ["Good", "Needs Improvement", "Needs Improvement"]
+    assert processed["attendance_status"].astype(str).tolist() == ["Regular", "Irregular", "Regular"]
+    # The published frame is replaced, never modified in place
+    assert original["gpa"].isna().sum() == 1
+
+    second = myendpoints.preprocess_data()
+    assert second == {"message": "Dataset already preprocessed", "version": 2, "changed": False}
+    assert store.snapshot()[0] is processed
+
+    # Preprocessing the processed frame again changes nothing either
+    pd.testing.assert_frame_equal(myendpoints.preprocess_frame(processed), processed)
@@ -0,0 +1,184 @@
+import asyncio
+import csv
+import datetime
+import io
+import json
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from database import Database
+
+ROWS = 250
+
+
+def student_rows(count=ROWS):
+    rows = []
+    for i in range(1, count + 1):
+        gpa = None if i % 50 == 0 else round(2.0 + (i % 20) / 10, 2)
+        subjects = None if i % 7 == 0 else ["Math", "Physics"][: 1 + i % 2]
+        rows.append((
+            i, f"Student_{i}", 15 + i % 6, 9 + i % 4, datetime.date(2025, 1, 1) + datetime.timedelta(days=i),
+            gpa, 0.9, None if gpa is None else gpa * 0.7 + 0.27, "Good", subjects,
+            None if subjects is None else ["A"] * len(subjects),
+        ))
+    return rows
+
+
+@pytest.fixture
+def client(monkeypatch):
+    streamed = {"chunk_sizes": []}
+
+    async def fake_stream(query, params=(), chunk_size=1000):
+        assert "LEFT JOIN LATERAL" in query
+        streamed["chunk_sizes"].append(chunk_size)
+        rows = student_rows()
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    async def no_second_connection(*args, **kwargs):
+        raise AssertionError("export must not query outside its stream")
+
+    monkeypatch.setattr(main.db, "stream", fake_stream)
+    monkeypatch.setattr(main.db, "fetch", no_second_connection)
+    monkeypatch.setattr(main, "USE_STORED_SCORE", True)
+    monkeypatch.setattr(main, "USE_STORED_STATUS", True)
+    monkeypatch.setattr(main, "transforms", None)
+    return TestClient(main.app), streamed
+
+
+def test_export_ndjson(client):
+    client, streamed = client
+    response = client.get("/students/export?format=ndjson&chunk_size=100")
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert streamed["chunk_sizes"] == [100]
+    assert [record["student_id"] for record in records] == list(range(1, ROWS + 1))
+    assert records[0]["subjects"] == ["Math", "Physics"]
+    assert records[6]["subjects"] == []
+    assert records[49]["gpa"] is None
+    assert records[0]["enrollment_date"] == "2025-01-02"
+
+
+def test_export_csv(client):
+    client, _ = client
+    response = client.get("/students/export?format=csv&chunk_size=100")
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == ROWS
+    assert rows[0]["subjects"] == "Math;Physics"
+    assert rows[0]["grades"] == "A;A"
+    assert rows[1]["subjects"] == "Math"
+    assert rows[6]["subjects"] == ""
+
+
+def test_export_arrow(client):
+    client, _ = client
+    response = client.get("/students/export?format=arrow&chunk_size=100")
+    assert response.status_code == 200
+    reader = pa.ipc.open_stream(response.content)
+    assert reader.schema.equals(main.EXPORT_ARROW_SCHEMA)
+    batches = list(reader)
+    assert len(batches) == 3
+    table = pa.Table.from_batches(batches)
+    assert table.column("student_id").to_pylist() == list(range(1, ROWS + 1))
+    assert table.column("subjects")[0].as_py() == ["Math", "Physics"]
+
+
+def test_export_empty_arrow_still_has_schema(monkeypatch, client):
+    client, _ = client
+
+    async def empty_stream(query, params=(), chunk_size=1000):
+        return
+        yield
+
+    monkeypatch.setattr(main.db, "stream", empty_stream)
+    response = client.get("/students/export?format=arrow")
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 0
+    assert table.schema.equals(main.EXPORT_ARROW_SCHEMA)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+
+    def execute(self, query, params):
+        self.query = query
+
+    def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    is_open = True
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+        self.checked_out = 0
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def acquire(self):
+        self.checked_out += 1
+        pool = self
+
+        class Connection:
+            def cursor(self, name=None):
+                assert name, "streaming needs a named (server-side) cursor"
+                cursor = FakeCursor(list(pool.rows))
+                pool.cursors.append(cursor)
+                return cursor
+
+        return Connection()
+
+    def release(self, conn):
+        self.checked_out -= 1
+
+
+def run_stream(pool, chunk_size, take=None):
+    async def consume():
+        db = Database(driver="psycopg2")
+        db._sync_pool = pool
+        await db.open()
+        chunks = []
+        stream = db.stream("SELECT 1", [], chunk_size)
+        try:
+            async for rows in stream:
+                chunks.append(rows)
+                if take is not None and len(chunks) == take:
+                    break
+        finally:
+            await stream.aclose()
+            await db.close()
+        return chunks
+
+    return asyncio.run(consume())
+
+
+def test_database_stream_yields_chunks_and_releases_connection():
+    pool = FakePool(list(range(25)))
+    chunks = run_stream(pool, 10)
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert pool.checked_out == 0
+    assert pool.cursors[0].closed
+
+
+def test_database_stream_closed_early_releases_connection():
+    pool = FakePool(list(range(25)))
+    chunks = run_stream(pool, 10, take=1)
+    assert len(chunks) == 1
+    assert pool.checked_out == 0
+    assert pool.cursors[0].closed
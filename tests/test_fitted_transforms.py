@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from fitted_transforms import ACADEMIC_QUANTILES, FittedTransforms, _label, _label_codes
+from myendpoints import generate_sample_data
+from scoring import ACADEMIC_LABELS
+
+
+def test_quantile_bins_match_qcut_on_training_data():
+    df = generate_sample_data(5000)
+    transforms = FittedTransforms.fit(df)
+    scaled = transforms.transform(df)
+    expected = pd.qcut(scaled['gpa'], q=ACADEMIC_QUANTILES, labels=ACADEMIC_LABELS)
+    assert (scaled['academic_status'].cat.codes.to_numpy() == expected.cat.codes.to_numpy()).all()
+
+
+def test_new_values_outside_fitted_edges_clip_to_outer_bins():
+    df = generate_sample_data(5000)
+    transforms = FittedTransforms.fit(df)
+    # Sample GPAs are drawn from [2.0, 4.0), so both are past the fitted edges
+    codes = transforms.transform_arrays({'gpa': [4.0, 0.5], 'attendance_rate': [1.5, 0.0]})
+    assert codes['academic_status'].tolist() == [3, 0]
+    assert codes['attendance_category'].tolist() == [2, 0]
+    assert transforms.transform_record({'gpa': 4.0, 'attendance_rate': 1.5})['academic_status'] == 'Excellent'
+    assert transforms.transform_record({'gpa': 0.5, 'attendance_rate': 0.0})['attendance_category'] == 'Low'
+
+
+def test_label_helpers_keep_missing_and_pd_cut_semantics():
+    edges = [0.0, 1.0, 2.0]
+    values = np.array([np.nan, -1.0, 0.0, 1.0, 1.5, 3.0])
+    assert _label_codes(values, edges, True, clip=True).tolist() == [-1, 0, 0, 0, 1, 1]
+    assert _label_codes(values, edges, True).tolist() == [-1, -1, 0, 0, 1, -1]
+    assert _label(None, edges, ['a', 'b'], True, clip=True) is None
+    assert _label(3.0, edges, ['a', 'b'], False) is None
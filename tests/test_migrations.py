@@ -0,0 +1,8 @@
+from migrations import STORED_SCORES
+from scoring import SCORE_FORMULAS, STATUS_SCHEMES, STORED_SCORE_VERSION, STORED_STATUS_SCHEME
+
+
+def test_stored_columns_match_the_stored_scoring_versions():
+    # Migration SQL is frozen; a formula or scheme change needs a new migration
+    assert f"AS ({SCORE_FORMULAS[STORED_SCORE_VERSION].sql()}) STORED" in STORED_SCORES
+    assert f"AS ({STATUS_SCHEMES[STORED_STATUS_SCHEME].sql('gpa')}) STORED" in STORED_SCORES
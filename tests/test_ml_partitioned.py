@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ml_analysis
+import ml_partitioned
+from fitted_transforms import ACADEMIC_QUANTILES
+from ml_partitioned import (
+    HISTOGRAM_BINS,
+    Moments,
+    bin_index,
+    compare_frames,
+    exact_quantiles,
+    merge_all,
+    run_partitioned,
+)
+from myendpoints import generate_sample_data
+
+
+def test_compare_frames_treats_shared_missing_values_as_equal():
+    expected = pd.DataFrame({
+        "academic_status": pd.Categorical(["Good", None, "Poor"], categories=["Poor", "Good"]),
+        "name": ["a", None, np.nan],
+    })
+    actual = pd.DataFrame({
+        # Same labels, categories in another order
+        "academic_status": pd.Categorical(["Good", None, "Poor"], categories=["Good", "Poor"]),
+        "name": ["a", np.nan, None],
+    })
+    report = compare_frames(expected, actual)
+    assert report["academic_status"] == {"mismatches": 0, "match": True}
+    assert report["name"] == {"mismatches": 0, "match": True}
+
+
+def test_compare_frames_counts_missing_on_one_side():
+    expected = pd.DataFrame({"academic_status": pd.Categorical(["Good", None, "Poor"])})
+    actual = pd.DataFrame({"academic_status": pd.Categorical(["Good", "Poor", "Good"])})
+    assert compare_frames(expected, actual)["academic_status"]["mismatches"] == 2
+
+
+
+def student_frame(rows, seed=3):
+    df = generate_sample_data(rows, seed=seed)
+    return df[['student_id', 'name', 'age', 'grade_level', 'enrollment_date', 'gpa', 'attendance_rate']]
+
+
+def single_process(df):
+    df = ml_analysis.handle_null_values(df.copy())
+    df = ml_analysis.preprocess_data(df)
+    return ml_analysis.create_features(df)
+
+
+def test_merged_moments_match_whole_column():
+    rng = np.random.default_rng(1)
+    values = rng.normal(3.0, 0.5, 10001)
+    values[rng.random(len(values)) < 0.05] = np.nan
+    parts = [Moments.from_values(part) for part in np.array_split(values, 7)] + [Moments.from_values([])]
+    merged = merge_all(parts)
+    valid = values[~np.isnan(values)]
+    assert merged.count == len(valid)
+    assert merged.nulls == len(values) - len(valid)
+    assert merged.mean == pytest.approx(valid.mean(), rel=1e-12)
+    assert merged.scale() == pytest.approx(valid.std(), rel=1e-12)
+    assert (merged.min, merged.max) == (valid.min(), valid.max())
+    # Imputed with the mean: same mean and M2 over more rows
+    imputed = np.where(np.isnan(values), valid.mean(), values)
+    assert merged.scale(imputed=True) == pytest.approx(imputed.std(), rel=1e-12)
+
+
+def test_exact_quantiles_match_numpy_with_ties():
+    rng = np.random.default_rng(2)
+    # Two decimals, like the numeric(3, 2) column: many exact ties
+    values = np.round(rng.uniform(2.0, 4.0, 20000), 2)
+    edges = np.linspace(values.min(), values.max(), HISTOGRAM_BINS + 1)
+    counts = np.bincount(bin_index(values, edges), minlength=HISTOGRAM_BINS)
+    cumulative = np.cumsum(counts)
+    ranks = ml_partitioned._quantile_ranks(len(values), ACADEMIC_QUANTILES)[1]
+    needed = np.unique(np.searchsorted(cumulative, ranks, side='right'))
+    gathered = values[np.isin(bin_index(values, edges), needed)]
+    result = exact_quantiles(counts, edges, gathered, ACADEMIC_QUANTILES)
+    assert result == pytest.approx(np.quantile(values, ACADEMIC_QUANTILES), abs=0, rel=1e-15)
+
+
+def test_run_partitioned_matches_single_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(ml_partitioned, 'SNAPSHOT_DIR', str(tmp_path))
+    df = student_frame(20000)
+    expected = single_process(df)
+    actual, transforms = run_partitioned(df, partitions=5, workers=2)
+
+    assert len(actual) == len(expected)
+    report = compare_frames(expected, actual)
+    assert all(column['match'] for column in report.values()), report
+    # Quantile edges come from histogram + refine, yet equal numpy's exactly
+    scaled_gpa = expected['gpa'].to_numpy(dtype=np.float64)
+    assert transforms.bins['gpa'] == pytest.approx(np.quantile(scaled_gpa, ACADEMIC_QUANTILES), rel=1e-9, abs=1e-12)
+    # Partition work directories are cleaned up
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,30 @@
+import pyarrow as pa
+import pytest
+
+from streaming import ARROW_MEDIA_TYPE, PayloadError, read_payload
+
+
+def arrow_body(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_arrow_payload_casts_numbers_and_nulls():
+    body = arrow_body(pa.table({"gpa": [3.0, None], "attendance_rate": pa.array([1, 0], pa.int8())}))
+    columns = read_payload(body, ARROW_MEDIA_TYPE)
+    assert columns["attendance_rate"].tolist() == [1.0, 0.0]
+    assert columns["gpa"][0] == 3.0
+
+
+@pytest.mark.parametrize("gpa", [pa.array(["3.x"]), pa.array([[3.0]]), pa.array([{"value": 3.0}])])
+def test_arrow_payload_with_uncastable_column_is_a_payload_error(gpa):
+    body = arrow_body(pa.table({"gpa": gpa, "attendance_rate": [0.9]}))
+    with pytest.raises(PayloadError):
+        read_payload(body, ARROW_MEDIA_TYPE)
+
+
+def test_arrow_payload_missing_column():
+    with pytest.raises(PayloadError, match="attendance_rate"):
+        read_payload(arrow_body(pa.table({"gpa": [3.0]})), ARROW_MEDIA_TYPE)
@@ -0,0 +1,63 @@
+import itertools
+
+import pytest
+
+from myendpoints import generate_sample_data
+from perf_index import PerformanceIndex
+
+
+def pandas_query(df, min_gpa=None, max_gpa=None, grade_level=None,
+                 min_attendance=None, max_attendance=None):
+    mask = df["student_id"].notna()
+    if min_gpa is not None:
+        mask &= df["gpa"] >= min_gpa
+    if max_gpa is not None:
+        mask &= df["gpa"] <= max_gpa
+    if grade_level is not None:
+        mask &= df["grade_level"] == grade_level
+    if min_attendance is not None:
+        mask &= df["attendance_rate"] >= min_attendance
+    if max_attendance is not None:
+        mask &= df["attendance_rate"] <= max_attendance
+    selected = df[mask]
+    return {
+        "total_students": len(selected),
+        "average_gpa": selected["gpa"].mean() if selected["gpa"].notna().any() else None,
+        "average_attendance": (selected["attendance_rate"].mean()
+                               if selected["attendance_rate"].notna().any() else None),
+    }
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return generate_sample_data(3000, seed=7)
+
+
+@pytest.fixture(scope="module")
+def index(frame):
+    return PerformanceIndex(frame)
+
+
+GPA_RANGES = [(None, None), (3.0, None), (None, 2.5), (2.5, 3.5), (3.9, 3.1)]
+ATTENDANCE_RANGES = [(None, None), (0.9, None), (0.75, 0.85)]
+GRADE_LEVELS = [None, 9, 12, 13]
+
+
+@pytest.mark.parametrize("gpa_range,attendance_range,grade_level",
+                         itertools.product(GPA_RANGES, ATTENDANCE_RANGES, GRADE_LEVELS))
+def test_index_matches_boolean_mask(frame, index, gpa_range, attendance_range, grade_level):
+    params = dict(min_gpa=gpa_range[0], max_gpa=gpa_range[1], grade_level=grade_level,
+                  min_attendance=attendance_range[0], max_attendance=attendance_range[1])
+    expected = pandas_query(frame, **params)
+    actual = index.query(**params)
+    assert actual["total_students"] == expected["total_students"]
+    for key in ("average_gpa", "average_attendance"):
+        if expected[key] is None:
+            assert actual[key] is None
+        else:
+            assert actual[key] == pytest.approx(expected[key], rel=1e-9)
+
+
+def test_bounds_are_inclusive(frame, index):
+    gpa = frame["gpa"].dropna().iloc[0]
+    assert index.query(min_gpa=gpa, max_gpa=gpa)["total_students"] == (frame["gpa"] == gpa).sum()
@@ -0,0 +1,65 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from myendpoints import generate_sample_data
+from pipeline_io import frame_hash, prune_snapshots, run_stage
+
+
+def test_frame_hash_covers_list_columns():
+    df = generate_sample_data(2000)
+    base = frame_hash(df)
+    assert frame_hash(df.copy()) == base
+
+    changed = df.copy()
+    changed.loc[7, 'subjects'] = ['Math']
+    assert frame_hash(changed) != base
+
+    # Same flat values, different row boundaries
+    moved = pd.DataFrame({'subjects': pd.Series([['a', 'b'], ['c']], dtype=df['subjects'].dtype)})
+    shifted = pd.DataFrame({'subjects': pd.Series([['a'], ['b', 'c']], dtype=df['subjects'].dtype)})
+    assert frame_hash(moved) != frame_hash(shifted)
+
+    empty = pd.DataFrame({'subjects': pd.Series([[], None], dtype=df['subjects'].dtype)})
+    null = pd.DataFrame({'subjects': pd.Series([None, []], dtype=df['subjects'].dtype)})
+    assert frame_hash(empty) != frame_hash(null)
+
+
+def test_frame_hash_object_lists():
+    lists = pd.DataFrame({'grades': [['A', 'B'], np.array(['C']), None]})
+    assert frame_hash(lists) == frame_hash(lists.copy())
+    other = pd.DataFrame({'grades': [['A', 'B'], np.array(['D']), None]})
+    assert frame_hash(lists) != frame_hash(other)
+    mixed = pd.DataFrame({'values': [[1, 'a'], [2.5]]})
+    assert frame_hash(mixed) == frame_hash(mixed.copy())
+
+
+def add_one(df):
+    df['x'] = df['x'] + 1
+    return df
+
+
+def test_run_stage_reuses_snapshot(tmp_path):
+    df = pd.DataFrame({'x': [1, 2, 3]})
+    first = run_stage('add_one', add_one, df, snapshot_dir=str(tmp_path))
+    again = run_stage('add_one', add_one, df, snapshot_dir=str(tmp_path))
+    assert first['x'].tolist() == again['x'].tolist() == [2, 3, 4]
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_prune_snapshots_by_age_and_size(tmp_path):
+    now = time.time()
+    paths = []
+    for i, age_days in enumerate([30, 3, 2, 1]):
+        path = tmp_path / f'stage-{i}.arrow'
+        path.write_bytes(b'x' * 100)
+        os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+        paths.append(str(path))
+    (tmp_path / 'partitions-tmp').mkdir()
+
+    removed = prune_snapshots(str(tmp_path), max_bytes=250, max_age_days=14, keep=paths[1])
+    # Too old, then least recently used until under 250 bytes; keep survives
+    assert sorted(removed) == sorted([paths[0], paths[2]])
+    assert sorted(os.listdir(tmp_path)) == ['partitions-tmp', 'stage-1.arrow', 'stage-3.arrow']
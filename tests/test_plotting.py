@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from plotting import box_plot, render_figures
+
+cbook = pytest.importorskip("matplotlib.cbook")
+
+
+def test_box_stats_match_matplotlib_including_fliers():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.normal(3.0, 0.3, 500), [0.5, 0.7, 5.5]])
+    groups = pd.Categorical(np.where(np.arange(len(values)) % 2, "b", "a"))
+    spec = box_plot("box", values, groups, "t", "x", "y")
+
+    for stats, label in zip(spec["stats"], ["a", "b"]):
+        expected = cbook.boxplot_stats(values[np.asarray(groups) == label])[0]
+        for key in ("q1", "med", "q3", "whislo", "whishi"):
+            assert stats[key] == pytest.approx(expected[key])
+        assert sorted(stats["fliers"]) == pytest.approx(sorted(expected["fliers"]))
+    assert sum(len(stats["fliers"]) for stats in spec["stats"]) >= 3
+
+
+def test_render_box_with_fliers(tmp_path):
+    values = np.array([1.0, 2.0, 2.1, 2.2, 2.3, 9.0])
+    spec = box_plot("box", values, ["g"] * len(values), "t", "x", "y")
+    assert spec["stats"][0]["fliers"].tolist() == [1.0, 9.0]
+    timings = render_figures([spec], str(tmp_path), workers=1)
+    assert timings["box"] is not None
+    assert (tmp_path / "box.png").exists()
@@ -0,0 +1,88 @@
+"""EXPLAIN checks against a migrated, loaded database; skipped without one."""
+import json
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+
+from migrations import get_database_connection, plan_scans
+from queries import SUBJECTS_FOR_STUDENTS_QUERY, build_students_page_query
+from search import build_search_query
+
+# Below this the planner rightly prefers sequential scans
+MIN_STUDENTS = 10000
+
+
+@pytest.fixture(scope="module")
+def conn():
+    try:
+        conn = get_database_connection()
+    except Exception as e:
+        pytest.skip(f"No Postgres available: {e}")
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM students")
+            count = cursor.fetchone()[0]
+            cursor.execute("ANALYZE students")
+            cursor.execute("ANALYZE student_subjects")
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.close()
+        pytest.skip(f"Students table unavailable: {e}")
+    if count < MIN_STUDENTS:
+        conn.close()
+        pytest.skip(f"Needs at least {MIN_STUDENTS} students, found {count}")
+    yield conn
+    conn.close()
+
+
+def explain(conn, query, params):
+    with conn.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        plan = cursor.fetchone()[0]
+    conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def index_names(plan):
+    return {node.get("Index Name") for node in plan_nodes(plan)} - {None}
+
+
+def test_substring_search_uses_trigram_index(conn):
+    plan = explain(conn, *build_search_query("smith"))
+    assert ("Seq Scan", "students") not in set(plan_scans(plan))
+    assert "students_name_trgm_idx" in index_names(plan)
+
+
+def test_prefix_search_uses_prefix_index(conn):
+    plan = explain(conn, *build_search_query("jo", mode="prefix"))
+    assert ("Seq Scan", "students") not in set(plan_scans(plan))
+    assert "students_name_prefix_idx" in index_names(plan)
+
+
+def test_keyset_page_walks_primary_key(conn):
+    plan = explain(conn, *build_students_page_query(after_id=250000))
+    assert ("Seq Scan", "students") not in set(plan_scans(plan))
+    assert "students_pkey" in index_names(plan)
+    # Rows come off the index already in id order
+    assert not any(node["Node Type"] == "Sort" for node in plan_nodes(plan))
+
+
+def test_gpa_range_page_uses_gpa_index(conn):
+    plan = explain(conn, *build_students_page_query(min_gpa=3.9, max_gpa=4.0))
+    assert ("Seq Scan", "students") not in set(plan_scans(plan))
+    assert "students_gpa_idx" in index_names(plan)
+
+
+def test_subject_lookup_uses_covering_index(conn):
+    plan = explain(conn, SUBJECTS_FOR_STUDENTS_QUERY, [list(range(1, 11))])
+    assert ("Seq Scan", "student_subjects") not in set(plan_scans(plan))
+    assert "student_subjects_student_covering_idx" in index_names(plan)
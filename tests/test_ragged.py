@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from ragged import RaggedColumn
+
+
+ROWS = [["Math", "Art"], [], ["History", None], ["Physics"]]
+
+
+def test_from_lists_with_empty_and_null_items():
+    ragged = RaggedColumn.from_lists(ROWS)
+    assert ragged.offsets.tolist() == [0, 2, 2, 4, 5]
+    assert ragged.lengths().tolist() == [2, 0, 2, 1]
+    assert ragged.to_lists() == ROWS
+    assert ragged.count().tolist() == [2, 0, 1, 1]
+
+
+def test_from_lists_missing_rows_are_empty():
+    ragged = RaggedColumn.from_lists(pd.Series([["A"], None, np.nan, np.array(["B", "C"])]))
+    assert ragged.to_lists() == [["A"], [], [], ["B", "C"]]
+
+
+def test_from_arrow_matches_from_lists():
+    array = pa.array(ROWS + [None], type=pa.list_(pa.string()))
+    ragged = RaggedColumn.from_arrow(array)
+    assert ragged.to_lists() == ROWS + [[]]
+    # Sliced and chunked arrays start their offsets at zero
+    assert RaggedColumn.from_arrow(array.slice(2, 2)).to_lists() == [["History", None], ["Physics"]]
+    chunked = pa.chunked_array([array.slice(0, 2), array.slice(2)])
+    assert RaggedColumn.from_arrow(chunked).to_lists() == ROWS + [[]]
+    series = pd.Series(ROWS, dtype=pd.ArrowDtype(pa.list_(pa.string())))
+    assert RaggedColumn.from_lists(series).to_lists() == ROWS
+
+
+def test_segment_mean_ignores_unmapped_items():
+    ragged = RaggedColumn.from_lists([["A", "B"], [], ["F", "X"]])
+    points = ragged.map_values({"A": 4.0, "B": 3.0, "F": 0.0})
+    assert np.isnan(points[-1])
+    means = ragged.segment_mean(points)
+    assert means[0] == 3.5
+    assert np.isnan(means[1])
+    assert means[2] == 0.0
@@ -0,0 +1,224 @@
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from response_cache import CachedResponse, InMemoryBackend, RedisBackend, ResponseCache
+
+
+def make_app(backend):
+    app = FastAPI()
+    calls = {"count": 0}
+
+    @app.get("/items")
+    def items(page: int = 1):
+        calls["count"] += 1
+        return {"page": page, "call": calls["count"]}
+
+    @app.get("/missing")
+    def missing():
+        calls["count"] += 1
+        return {}
+
+    @app.post("/items")
+    def create_item():
+        calls["count"] += 1
+        return {"call": calls["count"]}
+
+    @app.get("/broken")
+    def broken():
+        raise HTTPException(status_code=404)
+
+    cache = ResponseCache(backend, paths=["/items", "/broken"])
+    cache.install(app)
+    return TestClient(app), cache, calls
+
+
+def entry(body=b"x", stored_at=None):
+    return CachedResponse(200, body, "application/json", '"etag"', stored_at=stored_at)
+
+
+@pytest.fixture
+def memory_client():
+    return make_app(InMemoryBackend(max_entries=8, max_bytes=1024, ttl=30.0))
+
+
+def test_miss_then_hit(memory_client):
+    client, cache, calls = memory_client
+    first = client.get("/items")
+    second = client.get("/items")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert first.json() == second.json()
+    assert calls["count"] == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_query_params_are_normalized(memory_client):
+    client, _, calls = memory_client
+    client.get("/items?page=2&x=1")
+    response = client.get("/items?x=1&page=2")
+    assert response.headers["X-Cache"] == "HIT"
+    assert client.get("/items?page=3").headers["X-Cache"] == "MISS"
+    assert calls["count"] == 2
+
+
+def test_etag_not_modified(memory_client):
+    client, cache, _ = memory_client
+    etag = client.get("/items").headers["ETag"]
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    weak = client.get("/items", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert weak.status_code == 304
+    assert client.get("/items", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert cache.stats()["not_modified"] == 2
+
+
+def test_bypasses_other_methods_paths_and_errors(memory_client):
+    client, cache, calls = memory_client
+    client.post("/items")
+    client.post("/items")
+    assert calls["count"] == 2
+    assert "X-Cache" not in client.get("/missing").headers
+    assert client.get("/broken").status_code == 404
+    assert client.get("/broken").headers.get("X-Cache") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_ttl_expiry(monkeypatch):
+    backend = InMemoryBackend(ttl=10.0)
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    backend.set("/items", entry())
+    now[0] += 5
+    assert backend.get("/items") is not None
+    now[0] += 6
+    assert backend.get("/items") is None
+    assert backend.stats()["entries"] == 0
+    assert backend.stats()["bytes"] == 0
+
+
+def test_lru_eviction_by_entries():
+    backend = InMemoryBackend(max_entries=2, max_bytes=1024, ttl=30.0)
+    backend.set("a", entry())
+    backend.set("b", entry())
+    backend.get("a")
+    backend.set("c", entry())
+    assert backend.get("a") is not None
+    assert backend.get("b") is None
+    assert backend.get("c") is not None
+    assert backend.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    backend = InMemoryBackend(max_entries=100, max_bytes=10, ttl=30.0)
+    backend.set("a", entry(b"1234"))
+    backend.set("b", entry(b"1234"))
+    backend.set("c", entry(b"1234"))
+    assert backend.get("a") is None
+    assert backend.stats()["bytes"] == 8
+    # Larger than the whole budget: never stored
+    backend.set("big", entry(b"x" * 11))
+    assert backend.get("big") is None
+    assert backend.get("b") is not None
+
+
+def test_invalidate_prefix(memory_client):
+    client, cache, calls = memory_client
+    client.get("/items?page=1")
+    client.get("/items?page=2")
+    assert cache.invalidate("/items?page=1") == 1
+    assert client.get("/items?page=1").headers["X-Cache"] == "MISS"
+    assert client.get("/items?page=2").headers["X-Cache"] == "HIT"
+    assert cache.invalidate() == 2
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.fixture
+def redis_client():
+    fakeredis = pytest.importorskip("fakeredis")
+    return make_app(RedisBackend(fakeredis.FakeRedis(), ttl=30.0))
+
+
+def test_redis_hit_and_etag(redis_client):
+    client, cache, calls = redis_client
+    first = client.get("/items")
+    second = client.get("/items")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.content == first.content
+    assert calls["count"] == 1
+    response = client.get("/items", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_redis_ttl_and_invalidate(redis_client):
+    client, cache, _ = redis_client
+    client.get("/items?page=1")
+    client.get("/items?page=2")
+    ttl_ms = cache.backend.client.pttl("response-cache:/items?page=1")
+    assert 0 < ttl_ms <= 30000
+    assert cache.invalidate("/items?page=1") == 1
+    assert client.get("/items?page=1").headers["X-Cache"] == "MISS"
+    assert client.get("/items?page=2").headers["X-Cache"] == "HIT"
+
+
+def test_invalidate_endpoint_requires_token(monkeypatch):
+    import main
+
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, "CACHE_ADMIN_TOKEN", "")
+    assert client.post("/cache/invalidate").status_code == 404
+
+    monkeypatch.setattr(main, "CACHE_ADMIN_TOKEN", "secret")
+    assert client.post("/cache/invalidate").status_code == 403
+    headers = {"X-Cache-Admin-Token": "secret"}
+    assert client.post("/cache/invalidate?prefix=/other", headers=headers).status_code == 400
+    response = client.post("/cache/invalidate?prefix=/students", headers=headers)
+    assert response.status_code == 200
+    assert "invalidated" in response.json()
+
+
+def test_zero_ttl_disables_caching():
+    client, cache, calls = make_app(InMemoryBackend(ttl=0))
+    client.get("/items")
+    response = client.get("/items")
+    assert "X-Cache" not in response.headers
+    assert calls["count"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_loadtest_requests_bypass_the_cache():
+    from loadtest import cache_busted
+
+    first, second = cache_busted("/students?page=1000"), cache_busted("/students?page=1000")
+    assert first.startswith("/students?page=1000&_nocache=")
+    assert first != second
+    assert cache_busted("/students").startswith("/students?_nocache=")
+
+
+def test_glob_escape():
+    from response_cache import glob_escape
+
+    assert glob_escape("/students?search=a*b[1]\\") == "/students\\?search=a\\*b\\[1\\]\\\\"
+    assert glob_escape("/students") == "/students"
+
+
+@pytest.mark.parametrize("backend_name", ["memory", "redis"])
+def test_invalidate_prefix_is_literal(backend_name):
+    if backend_name == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = RedisBackend(fakeredis.FakeRedis(), ttl=30.0)
+    else:
+        backend = InMemoryBackend(ttl=30.0)
+    for key in ["/items?q=a*", "/items?q=ab", "/items?q=a?", "/items?q=[a]", "/items?q=b"]:
+        backend.set(key, entry())
+    assert backend.invalidate("/items?q=a*") == 1
+    assert backend.invalidate("/items?q=a?") == 1
+    assert backend.invalidate("/items?q=[a") == 1
+    assert backend.get("/items?q=ab") is not None
+    assert backend.get("/items?q=b") is not None
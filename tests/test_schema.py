@@ -0,0 +1,25 @@
+import inspect
+
+
+from myendpoints import generate_sample_data
+from ragged import RaggedColumn
+from schema import ARROW_STRING_LIST, list_column
+
+
+def test_generate_sample_data_at_default_size():
+    # Past ~300k rows pyarrow converts the flat values in several chunks
+    default = inspect.signature(generate_sample_data).parameters["num_records"].default
+    df = generate_sample_data()
+    assert len(df) == default
+    for column in ("subjects", "grades"):
+        assert df[column].dtype == ARROW_STRING_LIST
+        lengths = df[column].list.len()
+        assert lengths.between(3, 6).all()
+        assert len(df[column].list.flatten()) == lengths.sum()
+
+
+def test_list_column_matches_python_lists():
+    rows = [["Math", "Art"], [], ["History"], ["Physics", "Math", "Biology"]]
+    column = list_column(RaggedColumn.from_lists(rows))
+    assert column.dtype == ARROW_STRING_LIST
+    assert column.tolist() == rows
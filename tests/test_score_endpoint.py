@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "SCORE_MAX_BYTES", 200)
+    return TestClient(main.app)
+
+
+def test_scores_small_batch(client):
+    response = client.post("/students/score", json={"gpa": [3.6, None], "attendance_rate": [1.0, 0.5]})
+    assert response.status_code == 200
+    assert response.json()["academic_status"] == ["Excellent", "Unknown"]
+
+
+def test_declared_length_over_cap_is_refused_before_reading(client, monkeypatch):
+    async def unread(self):
+        raise AssertionError("body was read")
+        yield b""
+
+    monkeypatch.setattr(main.Request, "stream", unread)
+    body = json.dumps({"gpa": [3.0] * 100, "attendance_rate": [0.9] * 100})
+    response = client.post("/students/score", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 413
+
+
+def test_chunked_body_over_cap_is_refused(client):
+    def chunks():
+        yield b'{"gpa": ['
+        for _ in range(100):
+            yield b"3.0, "
+        yield b'3.0], "attendance_rate": [0.9]}'
+
+    response = client.post("/students/score", content=chunks(), headers={"content-type": "application/json"})
+    assert response.status_code == 413
+
+
+def test_invalid_content_length(client):
+    response = client.post(
+        "/students/score", content=b"{}", headers={"content-type": "application/json", "content-length": "abc"}
+    )
+    assert response.status_code == 400
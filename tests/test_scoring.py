@@ -0,0 +1,157 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoring import (
+    SCORE_FORMULAS,
+    STATUS_SCHEMES,
+    academic_status,
+    check_api_versions,
+    performance_score,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_api_versions_accept_raw_gpa_formulas():
+    check_api_versions("api-v1", "api-v1")
+    check_api_versions("api-v1", "dataset-v1")
+
+
+@pytest.mark.parametrize("score_version, status_scheme, message", [
+    ("api-v2", "api-v1", "Unknown SCORE_VERSION"),
+    ("pipeline-v1", "api-v1", "average_grade_points"),
+    ("ml-v1", "api-v1", "transformed inputs"),
+    ("api-v1", "api_v1", "Unknown STATUS_SCHEME"),
+    ("api-v1", "attendance-v1", "attendance_rate"),
+])
+def test_api_versions_reject_unusable_settings(score_version, status_scheme, message):
+    with pytest.raises(ValueError, match=message):
+        check_api_versions(score_version, status_scheme)
+
+
+def test_main_refuses_to_start_with_unusable_score_version():
+    env = dict(os.environ, SCORE_VERSION="pipeline-v1")
+    result = subprocess.run([sys.executable, "-c", "import main"], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "average_grade_points" in result.stderr
+
+
+# The per-module versions scoring.py replaced, kept here as the reference
+def legacy_api_score(gpa, attendance):
+    if gpa is None or attendance is None:
+        return None
+    return (float(gpa) * 0.7) + (float(attendance) * 0.3)
+
+
+def legacy_api_status(gpa):
+    if gpa is None:
+        return "Unknown"
+    gpa = float(gpa)
+    if gpa >= 3.5:
+        return "Excellent"
+    elif gpa >= 3.0:
+        return "Good"
+    elif gpa >= 2.5:
+        return "Fair"
+    else:
+        return "Poor"
+
+
+def legacy_pipeline_score(df):
+    return df['gpa'] * 0.4 + df['attendance_rate'] * 0.3 + df['average_grade_points'] * 0.3
+
+
+def legacy_ml_score(df):
+    return (df['gpa'] + df['attendance_rate']) / 2
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({
+        "gpa": np.round(rng.uniform(2.0, 4.0, 50), 2),
+        "attendance_rate": np.round(rng.uniform(0.6, 1.0, 50), 2),
+        "average_grade_points": np.round(rng.uniform(1.0, 4.0, 50), 1),
+    })
+    df.loc[[3, 17], "gpa"] = np.nan
+    df.loc[8, "attendance_rate"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("gpa, attendance", [
+    (3.2, 0.95), (Decimal("3.75"), Decimal("0.80")), (2.0, 0), (None, 0.9), (3.1, None),
+])
+def test_api_score_matches_legacy_on_scalars(gpa, attendance):
+    assert performance_score({"gpa": gpa, "attendance_rate": attendance}, "api-v1") == \
+        legacy_api_score(gpa, attendance)
+
+
+def test_formulas_match_legacy_on_frames_series_and_arrays(frame):
+    legacy = {
+        "api-v1": frame["gpa"] * 0.7 + frame["attendance_rate"] * 0.3,
+        "pipeline-v1": legacy_pipeline_score(frame),
+        "ml-v1": legacy_ml_score(frame),
+    }
+    for version, expected in legacy.items():
+        pd.testing.assert_series_equal(performance_score(frame, version), expected, check_names=False)
+        columns = {column: frame[column] for column in SCORE_FORMULAS[version].columns}
+        pd.testing.assert_series_equal(performance_score(columns, version), expected, check_names=False)
+        arrays = {column: values.to_numpy() for column, values in columns.items()}
+        np.testing.assert_array_equal(performance_score(arrays, version), expected.to_numpy())
+
+
+def test_api_score_on_lists_with_none():
+    scores = performance_score({"gpa": [3.0, None], "attendance_rate": [1.0, 0.9]}, "api-v1")
+    assert scores[0] == legacy_api_score(3.0, 1.0)
+    assert np.isnan(scores[1])
+
+
+@pytest.mark.parametrize("gpa", [None, 1.99, 2.0, 2.49, 2.5, 2.99, 3.0, 3.49, 3.5, 4.0, Decimal("3.50")])
+def test_api_status_matches_legacy_at_boundaries(gpa):
+    assert academic_status(gpa, "api-v1") == legacy_api_status(gpa)
+
+
+def test_status_nan_is_missing():
+    assert academic_status(float("nan"), "api-v1") == "Unknown"
+    assert STATUS_SCHEMES["dataset-v1"](np.nan) == "Unknown"
+
+
+@pytest.mark.parametrize("version, values, expected", [
+    ("dataset-v1", [2.99, 3.0, 3.5], ["Needs Improvement", "Good", "Good"]),
+    ("attendance-v1", [0.79, 0.8, 1.0], ["Irregular", "Regular", "Regular"]),
+])
+def test_threshold_schemes_at_boundaries(version, values, expected):
+    scheme = STATUS_SCHEMES[version]
+    assert [scheme(value) for value in values] == expected
+    assert scheme(np.array(values + [np.nan])).tolist() == expected + ["Unknown"]
+    labelled = scheme(pd.Series(values + [None], dtype=float))
+    assert list(labelled.cat.categories) == scheme.labels
+    assert labelled.iloc[:-1].tolist() == expected
+    assert pd.isna(labelled.iloc[-1])
+
+
+def test_sql_rendering_agrees_with_python(frame):
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE students (gpa REAL, attendance_rate REAL, average_grade_points REAL)")
+    rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False)
+    connection.executemany("INSERT INTO students VALUES (?, ?, ?)", list(rows))
+    boundaries = [(3.5, 0.8, 3.0), (3.0, 0.79, 2.5), (2.5, None, 2.0), (None, 1.0, 1.0)]
+    connection.executemany("INSERT INTO students VALUES (?, ?, ?)", boundaries)
+    table = pd.read_sql("SELECT * FROM students", connection)
+
+    for version, formula in SCORE_FORMULAS.items():
+        sql = [row[0] for row in connection.execute(f"SELECT {formula.sql('s')} FROM students s")]
+        expected = formula(table)
+        assert np.allclose(np.array(sql, dtype=float), expected, rtol=1e-12, equal_nan=True), version
+
+    for version, scheme in STATUS_SCHEMES.items():
+        sql = [row[0] for row in connection.execute(f"SELECT {scheme.sql(scheme.column)} FROM students")]
+        assert sql == [scheme(value) for value in table[scheme.column].tolist()], version
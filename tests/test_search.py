@@ -0,0 +1,34 @@
+import pytest
+
+from search import PREFIX_SEARCH_QUERY, SUBSTRING_SEARCH_QUERY, build_search_query, escape_like
+
+
+def test_escape_like_escapes_wildcards_and_backslash():
+    assert escape_like("100%") == "100\\%"
+    assert escape_like("a_b") == "a\\_b"
+    assert escape_like("c:\\temp") == "c:\\\\temp"
+    # Backslash first, so the escapes it adds aren't escaped again
+    assert escape_like("\\%_") == "\\\\\\%\\_"
+
+
+def test_substring_query_matches_term_literally():
+    query, params = build_search_query(" 50%_off\\ ", limit=5)
+    assert query == SUBSTRING_SEARCH_QUERY
+    assert params == ["50%_off\\", "%50\\%\\_off\\\\%", "50%_off\\", 5]
+
+
+def test_prefix_query_lowercases_and_escapes():
+    query, params = build_search_query("Jo_%", mode="prefix")
+    assert query == PREFIX_SEARCH_QUERY
+    assert params == ["Jo_%", "jo\\_\\%%", 10]
+
+
+def test_short_substring_terms_fall_back_to_prefix():
+    query, params = build_search_query("j%")
+    assert query == PREFIX_SEARCH_QUERY
+    assert params[1] == "j\\%%"
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        build_search_query("smith", mode="fuzzy")
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from stats import summarize_grade_stats
+
+
+def test_summarize_grade_stats():
+    early = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    late = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    # grade_level, student_count, gpa_count, gpa_sum, attendance_count, attendance_sum, updated_at
+    rows = [
+        (9, 4, 4, Decimal("12.00"), 3, Decimal("2.70"), late),
+        (10, 2, 1, Decimal("2.50"), 2, Decimal("1.80"), early),
+        (11, 1, 0, Decimal("0"), 0, Decimal("0"), early),
+    ]
+    summary = summarize_grade_stats(rows)
+
+    assert summary["total_students"] == 7
+    # (12.00 + 2.50) / 5 students with a gpa
+    assert summary["average_gpa"] == pytest.approx(2.9)
+    # (2.70 + 1.80) / 5 students with an attendance rate
+    assert summary["average_attendance"] == pytest.approx(0.9)
+    assert summary["grade_levels"] == 3
+    assert summary["updated_at"] == late.isoformat()
+    assert summary["by_grade_level"] == [
+        {"grade_level": 9, "total_students": 4, "average_gpa": 3.0, "average_attendance": pytest.approx(0.9)},
+        {"grade_level": 10, "total_students": 2, "average_gpa": 2.5, "average_attendance": pytest.approx(0.9)},
+        {"grade_level": 11, "total_students": 1, "average_gpa": None, "average_attendance": None},
+    ]
+
+
+def test_summarize_no_rows():
+    summary = summarize_grade_stats([])
+    assert summary == {
+        "total_students": 0,
+        "average_gpa": None,
+        "average_attendance": None,
+        "grade_levels": 0,
+        "by_grade_level": [],
+        "updated_at": None,
+    }
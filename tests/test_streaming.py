@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from myendpoints import generate_sample_data
+from schema import ARROW_STRING_LIST
+from streaming import encode_frame
+
+
+def read_csv_rows(df, **kwargs):
+    body = b"".join(encode_frame(df, "csv", **kwargs)).decode()
+    return list(csv.reader(io.StringIO(body)))
+
+
+def test_csv_joins_arrow_list_columns_per_chunk():
+    lists = [["Math", "Art"], [], None, ["History"]]
+    df = pd.DataFrame({
+        "student_id": [1, 2, 3, 4],
+        "subjects": pd.Series(lists, dtype=ARROW_STRING_LIST),
+    })
+    rows = read_csv_rows(df, chunk_rows=3)
+    assert rows == [["student_id", "subjects"], ["1", "Math;Art"], ["2", ""], ["3", ""], ["4", "History"]]
+
+
+def test_csv_joins_object_lists_and_arrays():
+    # A long ndarray repr would wrap across lines
+    df = pd.DataFrame({
+        "student_id": [1, 2, 3],
+        "grades": [np.array(["A", "B"] * 50), ["C"], None],
+    })
+    rows = read_csv_rows(df)
+    assert len(rows) == 4
+    assert rows[1] == ["1", ";".join(["A", "B"] * 50)]
+    assert rows[2] == ["2", "C"]
+    assert rows[3] == ["3", ""]
+
+
+def test_csv_separator_option():
+    df = pd.DataFrame({"subjects": pd.Series([["Math", "Art"]], dtype=ARROW_STRING_LIST)})
+    assert read_csv_rows(df, separator="|")[1] == ["Math|Art"]
+
+
+def test_arrow_stream_round_trips_multiple_chunks():
+    df = pd.DataFrame({"a": range(25000), "b": np.linspace(0, 1, 25000)})
+    body = b"".join(encode_frame(df, "arrow", chunk_rows=10000))
+    reader = pa.ipc.open_stream(body)
+    batches = list(reader)
+    assert len(batches) == 3
+    pd.testing.assert_frame_equal(pa.Table.from_batches(batches).to_pandas(), df)
+
+
+def test_arrow_stream_casts_later_chunks_to_the_first_schema():
+    chunks = [pd.DataFrame({"a": [1.5, 2.5]}), pd.DataFrame({"a": [3, 4]})]
+    table = pa.ipc.open_stream(b"".join(encode_frame(chunks, "arrow"))).read_all()
+    assert table.schema.field("a").type == pa.float64()
+    assert table.column("a").to_pylist() == [1.5, 2.5, 3.0, 4.0]
+
+
+def baseline_records(df):
+    """What /dataset/sample returned before streaming: FastAPI's JSON of to_dict."""
+    from fastapi.encoders import jsonable_encoder
+
+    legacy = df.assign(
+        enrollment_date=df["enrollment_date"].dt.date,
+        subjects=df["subjects"].tolist(),
+        grades=df["grades"].tolist(),
+    ).astype(object)
+    legacy = legacy.where(legacy.notna(), None)
+    return jsonable_encoder(legacy.to_dict(orient="records"))
+
+
+def assert_same_records(actual, expected):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert got.keys() == want.keys()
+        for key, value in want.items():
+            if isinstance(value, float):
+                assert got[key] == pytest.approx(value, rel=1e-14, abs=0)
+            else:
+                assert got[key] == value
+
+
+@pytest.mark.parametrize("fmt", ["json", "ndjson"])
+def test_json_sample_matches_baseline_payload(fmt):
+    df = generate_sample_data(50)
+    body = b"".join(encode_frame(df, fmt, chunk_rows=20)).decode()
+    records = json.loads(body) if fmt == "json" else [json.loads(line) for line in body.splitlines()]
+    assert_same_records(records, baseline_records(df))
+    assert records[0]["enrollment_date"] == df["enrollment_date"].dt.date.iloc[0].isoformat()
+
+
+def test_json_keeps_timestamps_with_a_time_of_day():
+    df = pd.DataFrame({"at": pd.to_datetime(["2026-01-02 03:04:05", None])})
+    records = json.loads(b"".join(encode_frame(df, "json")))
+    assert records == [{"at": "2026-01-02T03:04:05.000"}, {"at": None}]